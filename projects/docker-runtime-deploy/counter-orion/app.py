@@ -1,31 +1,86 @@
 from datetime import datetime, timedelta, timezone
-from functools import wraps
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache, partial, wraps
+from typing import NamedTuple, Optional
+import base64
+import binascii
+import csv
+import hashlib
+import io
+import json
+import math
 import os
+import time
 
 import jwt
-from flask import Flask, Response, g, jsonify, request, send_file
-from flask_migrate import Migrate
+from flask import Blueprint, Flask, Response, current_app, g, jsonify, request, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import func
-from werkzeug.security import check_password_hash, generate_password_hash
-
-app = Flask(__name__)
+from sqlalchemy import case, cast, delete, event, func, insert, literal, literal_column, select, text, tuple_, union_all, update
+
+from assets import AssetManifest
+from catalog_search import CatalogEntry, CatalogSearch
+from db_pool import database_url, engine_options, install_sqlite_pragmas, pool_stats, sqlite_database_url
+from json_provider import FastJSONProvider
+import metrics
+from password_hashing import HashingOverloaded, PasswordHasher
+from readiness import ReadinessProber, migration_heads
+import sql_tracing
+from static_pages import render_page
+from ttl_cache import TTLCache
 
 APP_NAME = os.getenv("APP_NAME", "counter-orion")
 APP_VERSION = os.getenv("APP_VERSION", "dev")
 JWT_SECRET = os.getenv("JWT_SECRET", "change-me")
 JWT_ACCESS_TTL_MIN = int(os.getenv("JWT_ACCESS_TTL_MIN", "30"))
 JWT_REFRESH_TTL_DAYS = int(os.getenv("JWT_REFRESH_TTL_DAYS", "7"))
-
-raw_db_url = os.getenv("DATABASE_URL", "sqlite:////tmp/counter_orion.db")
-if raw_db_url.startswith("postgresql://"):
-    raw_db_url = raw_db_url.replace("postgresql://", "postgresql+psycopg2://", 1)
-
-app.config["SQLALCHEMY_DATABASE_URI"] = raw_db_url
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+CATALOG_INDEX_REFRESH_SEC = float(os.getenv("CATALOG_INDEX_REFRESH_SEC", "10"))
+CATALOG_RESPONSE_CACHE_SIZE = int(os.getenv("CATALOG_RESPONSE_CACHE_SIZE", "2048"))
+CATALOG_RESPONSE_CACHE_TTL_SEC = float(os.getenv("CATALOG_RESPONSE_CACHE_TTL_SEC", "3600"))
+CATALOG_TOTALS_CACHE_SIZE = int(os.getenv("CATALOG_TOTALS_CACHE_SIZE", "1024"))
+CATALOG_TOTALS_TTL_SEC = float(os.getenv("CATALOG_TOTALS_TTL_SEC", "300"))
+SKINS_MAX_PAGE_SIZE = 500
+SKINS_IMPORT_BATCH_SIZE = int(os.getenv("SKINS_IMPORT_BATCH_SIZE", "1000"))
+SKINS_IMPORT_MAX_ERRORS = 100
+SKINS_BATCH_MAX_OPERATIONS = int(os.getenv("SKINS_BATCH_MAX_OPERATIONS", "500"))
+SKINS_EXPORT_COLUMNS = (
+    "catalog_skin_id",
+    "weapon",
+    "skin_name",
+    "rarity",
+    "wear",
+    "stattrak",
+    "quantity",
+    "note",
+    "buy_price_eur",
+    "created_at",
+)
+# user_skins.buy_price_eur is NUMERIC(10, 2).
+PRICE_QUANTUM = Decimal("0.01")
+PRICE_LIMIT = 10**8
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL_SEC = float(os.getenv("TOKEN_CACHE_TTL_SEC", "300"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Hashing may hold all but one of a worker's request threads; past that, logins get 503.
+WEB_THREADS = int(os.getenv("WEB_THREADS", "4"))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", str(max(0, WEB_THREADS - PASSWORD_HASH_WORKERS - 1))))
+PASSWORD_HASH_TIMEOUT_SEC = float(os.getenv("PASSWORD_HASH_TIMEOUT_SEC", "10"))
+USER_CACHE_TTL_SEC = float(os.getenv("USER_CACHE_TTL_SEC", "60"))
+SKINS_STREAM_BATCH_SIZE = int(os.getenv("SKINS_STREAM_BATCH_SIZE", "500"))
+READY_PROBE_INTERVAL_SEC = float(os.getenv("READY_PROBE_INTERVAL_SEC", "5"))
+
+raw_db_url = database_url()
+
+db = SQLAlchemy()
+bp = Blueprint("counter_orion", __name__)
+
+password_hasher = PasswordHasher(
+    method=PASSWORD_HASH_METHOD,
+    workers=PASSWORD_HASH_WORKERS,
+    queue_limit=PASSWORD_HASH_QUEUE,
+    timeout=PASSWORD_HASH_TIMEOUT_SEC,
+)
 
 
 class User(db.Model):
@@ -38,10 +93,13 @@ class User(db.Model):
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self) -> bool:
+        return password_hasher.needs_rehash(self.password_hash)
 
 
 class SkinCatalog(db.Model):
@@ -57,6 +115,17 @@ class SkinCatalog(db.Model):
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
+class CatalogState(db.Model):
+    """Single row describing the last catalog seed applied by scripts/seed_catalog.py."""
+
+    __tablename__ = "catalog_state"
+
+    id = db.Column(db.Integer, primary_key=True)
+    seed_hash = db.Column(db.String(64), nullable=False)
+    applied_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    catalog_version = db.Column(db.Integer, nullable=False, server_default="1")
+
+
 class UserSkin(db.Model):
     __tablename__ = "user_skins"
 
@@ -75,6 +144,55 @@ class UserSkin(db.Model):
     catalog_skin = db.relationship("SkinCatalog", backref=db.backref("owned_entries", lazy=True))
 
 
+class UserPortfolioSummary(db.Model):
+    """Running inventory totals per user for one (dimension, bucket) pair.
+
+    Dimensions are total, weapon, rarity, wear and stattrak; `bucket` is ""
+    for the total row and for entries without a wear.
+    """
+
+    __tablename__ = "user_portfolio_summary"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    dimension = db.Column(db.String(16), primary_key=True)
+    bucket = db.Column(db.String(128), primary_key=True)
+    item_count = db.Column(db.Integer, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    spend_eur = db.Column(db.Numeric(12, 2), nullable=False)
+
+
+class CurrentUser(NamedTuple):
+    """Detached snapshot of the authenticated user stored on `g.current_user`."""
+
+    id: int
+    email: str
+    username: str
+    created_at: Optional[datetime]
+
+
+# Authenticated-user snapshots by id. Entries are dropped when this worker
+# changes a user; the TTL bounds staleness for changes made elsewhere.
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SEC)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.pop(target.id)
+
+
+def _load_current_user(user_id: int) -> Optional[CurrentUser]:
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+    user = db.session.get(User, user_id)
+    if not user:
+        return None
+    snapshot = CurrentUser(user.id, user.email, user.username, user.created_at)
+    user_cache.set(user_id, snapshot)
+    return snapshot
+
+
 def _create_token(user: User, token_type: str) -> str:
     now = datetime.now(timezone.utc)
     ttl = timedelta(minutes=JWT_ACCESS_TTL_MIN) if token_type == "access" else timedelta(days=JWT_REFRESH_TTL_DAYS)
@@ -89,14 +207,105 @@ def _create_token(user: User, token_type: str) -> str:
     return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
 
 
+# Verified token payloads keyed by SHA-256 of the raw token. Only tokens that
+# passed signature verification get in, and never past their own `exp`.
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL_SEC)
+
+
 def _decode_token(token: str, expected_type: str):
-    payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+        remaining = payload["exp"] - time.time() if "exp" in payload else TOKEN_CACHE_TTL_SEC
+        token_cache.set(key, payload, ttl=min(TOKEN_CACHE_TTL_SEC, remaining))
+    elif "exp" in payload and payload["exp"] <= time.time():
+        token_cache.pop(key)
+        raise jwt.ExpiredSignatureError("Signature has expired")
+
     if payload.get("type") != expected_type:
         raise jwt.InvalidTokenError("invalid token type")
     return payload
 
 
-def _catalog_to_dict(item: SkinCatalog) -> dict:
+def _load_catalog_entries(app: Flask):
+    with app.app_context():
+        rows = db.session.query(SkinCatalog.id, SkinCatalog.weapon, SkinCatalog.skin_name, SkinCatalog.rarity).all()
+    return [CatalogEntry(*row) for row in rows]
+
+
+def _load_catalog_version(app: Flask) -> int:
+    with app.app_context():
+        version = db.session.query(CatalogState.catalog_version).filter(CatalogState.id == 1).scalar()
+    return version or 0
+
+
+def _catalog_search() -> CatalogSearch:
+    return current_app.extensions["catalog_search"]
+
+
+# Catalog filter totals, keyed by (catalog version, weapon, rarity, q).
+# A seed run bumps the version, so stale counts are simply never read again.
+catalog_totals = TTLCache(maxsize=CATALOG_TOTALS_CACHE_SIZE, ttl=CATALOG_TOTALS_TTL_SEC)
+
+# Rendered catalog response bodies, keyed by (endpoint, catalog version, query args).
+catalog_responses = TTLCache(maxsize=CATALOG_RESPONSE_CACHE_SIZE, ttl=CATALOG_RESPONSE_CACHE_TTL_SEC)
+
+
+def _arg_flag(name: str, default: bool) -> bool:
+    value = request.args.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+_sqlite_catalog_fts = None
+
+
+def _has_sqlite_catalog_fts() -> bool:
+    global _sqlite_catalog_fts
+    if _sqlite_catalog_fts is None:
+        _sqlite_catalog_fts = bool(
+            db.session.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'skins_catalog_fts'")).first()
+        )
+    return _sqlite_catalog_fts
+
+
+def _catalog_text_filter(q: str):
+    """Substring filter on weapon/skin_name that the dialect's text index can serve.
+
+    Postgres answers ILIKE '%q%' from the pg_trgm GIN indexes; SQLite goes through
+    the FTS5 trigram table, which needs at least 3 characters.
+    """
+    if db.engine.dialect.name == "sqlite" and len(q) >= 3 and _has_sqlite_catalog_fts():
+        phrase = '"' + q.replace('"', '""') + '"'
+        matches = text("SELECT rowid FROM skins_catalog_fts WHERE skins_catalog_fts MATCH :phrase").bindparams(phrase=phrase)
+        return SkinCatalog.id.in_(matches)
+
+    pattern = f"%{q}%"
+    return (SkinCatalog.skin_name.ilike(pattern)) | (SkinCatalog.weapon.ilike(pattern))
+
+
+def _encode_cursor(values) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, types: tuple) -> list:
+    """Inverse of _encode_cursor; raises ValueError unless values match `types`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError("invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("invalid cursor")
+    if not all(isinstance(v, t) and not isinstance(v, bool) for v, t in zip(values, types)):
+        raise ValueError("invalid cursor")
+    return values
+
+
+def _catalog_to_dict(item) -> dict:
     return {
         "id": item.id,
         "weapon": item.weapon,
@@ -105,14 +314,80 @@ def _catalog_to_dict(item: SkinCatalog) -> dict:
     }
 
 
-def _user_skin_to_dict(item: UserSkin) -> dict:
+def _user_skin_rows(*extra_columns):
+    """Inventory rows joined with their catalog columns, as plain row tuples.
+
+    One statement no matter how many rows are read; nothing goes through the
+    lazy `UserSkin.catalog_skin` relationship.
+    """
+    return db.session.query(
+        UserSkin.id,
+        UserSkin.user_id,
+        UserSkin.catalog_skin_id,
+        SkinCatalog.weapon,
+        SkinCatalog.skin_name,
+        SkinCatalog.rarity,
+        UserSkin.wear,
+        UserSkin.stattrak,
+        UserSkin.quantity,
+        UserSkin.note,
+        UserSkin.buy_price_eur,
+        UserSkin.created_at,
+        UserSkin.updated_at,
+        *extra_columns,
+    ).outerjoin(SkinCatalog, SkinCatalog.id == UserSkin.catalog_skin_id)
+
+
+def _user_skin_row(skin_id: int):
+    return _user_skin_rows().filter(UserSkin.id == skin_id).one()
+
+
+def _portfolio_returning(table) -> tuple:
+    """RETURNING columns that feed the portfolio summary, catalog ones via subqueries."""
+    catalog = SkinCatalog.__table__
+
+    def catalog_column(name):
+        return select(catalog.c[name]).where(catalog.c.id == table.c.catalog_skin_id).scalar_subquery().label(name)
+
+    return (
+        table.c.id,
+        catalog_column("weapon"),
+        catalog_column("rarity"),
+        table.c.wear,
+        table.c.stattrak,
+        table.c.quantity,
+        table.c.buy_price_eur,
+    )
+
+
+def _lock_user_skins(user_id: int, skin_ids) -> dict:
+    """Lock the user's entries among `skin_ids` and return their current rows by id.
+
+    A no-op UPDATE ... RETURNING rather than a SELECT: it row-locks on
+    Postgres and takes the write lock on SQLite (where pysqlite runs plain
+    SELECTs outside the transaction), so a concurrent change to the same
+    entries waits and summary deltas are computed from the values actually
+    being replaced.
+    """
+    table = UserSkin.__table__
+    stmt = (
+        update(table)
+        .where(table.c.user_id == user_id, table.c.id.in_(skin_ids))
+        # Assigning updated_at to itself also keeps its onupdate from firing.
+        .values(updated_at=table.c.updated_at)
+        .returning(*_portfolio_returning(table))
+    )
+    return {row.id: row for row in db.session.execute(stmt)}
+
+
+def _user_skin_to_dict(item) -> dict:
     return {
         "id": item.id,
         "user_id": item.user_id,
         "catalog_skin_id": item.catalog_skin_id,
-        "weapon": item.catalog_skin.weapon if item.catalog_skin else None,
-        "skin_name": item.catalog_skin.skin_name if item.catalog_skin else None,
-        "rarity": item.catalog_skin.rarity if item.catalog_skin else None,
+        "weapon": item.weapon,
+        "skin_name": item.skin_name,
+        "rarity": item.rarity,
         "wear": item.wear,
         "stattrak": item.stattrak,
         "quantity": item.quantity,
@@ -123,7 +398,245 @@ def _user_skin_to_dict(item: UserSkin) -> dict:
     }
 
 
-def auth_required(fn):
+def _skin_fields(data: dict, partial: bool = False) -> dict:
+    """Validated UserSkin column values from a payload; raises ValueError.
+
+    With `partial=True` only the keys present in `data` are returned, as PUT
+    leaves the other columns untouched. `buy_price_eur` comes back as a
+    Decimal rounded to the column's scale, so the stored row and the
+    portfolio summary delta use the same value.
+    """
+    fields = {}
+    if not partial or "wear" in data:
+        fields["wear"] = (data.get("wear") or "").strip() or None
+    if not partial or "stattrak" in data:
+        fields["stattrak"] = bool(data.get("stattrak", False))
+    if not partial or "quantity" in data:
+        try:
+            quantity = int(data.get("quantity", 1))
+        except (TypeError, ValueError):
+            raise ValueError("quantity must be an integer") from None
+        if quantity < 1:
+            raise ValueError("quantity must be >= 1")
+        fields["quantity"] = quantity
+    if not partial or "note" in data:
+        fields["note"] = (data.get("note") or "").strip() or None
+    if not partial or "buy_price_eur" in data:
+        buy_price = data.get("buy_price_eur")
+        if buy_price is None or str(buy_price).strip() == "":
+            fields["buy_price_eur"] = None
+        else:
+            try:
+                buy_price = float(buy_price)
+            except (TypeError, ValueError):
+                raise ValueError("buy_price_eur must be a number") from None
+            if not math.isfinite(buy_price):
+                raise ValueError("buy_price_eur must be a number")
+            if buy_price < 0:
+                raise ValueError("buy_price_eur must be >= 0")
+            if buy_price >= PRICE_LIMIT:
+                raise ValueError(f"buy_price_eur must be < {PRICE_LIMIT}")
+            fields["buy_price_eur"] = Decimal(str(buy_price)).quantize(PRICE_QUANTUM, rounding=ROUND_HALF_UP)
+    return fields
+
+
+def _catalog_resolver():
+    """Resolve import rows to catalog ids using one catalog query.
+
+    A row may name its skin by `catalog_skin_id`, by `weapon` + `skin_name`,
+    or by a single `skin` column in the "weapon | skin_name" form. Returns the
+    resolver and a map of catalog id to (weapon, rarity).
+    """
+    ids = {}
+    by_name = {}
+    query = db.session.query(SkinCatalog.id, SkinCatalog.weapon, SkinCatalog.skin_name, SkinCatalog.rarity)
+    for catalog_id, weapon, skin_name, rarity in query:
+        ids[catalog_id] = (weapon, rarity)
+        by_name[f"{weapon} | {skin_name}".casefold()] = catalog_id
+
+    def resolve(record: dict) -> int:
+        raw_id = record.get("catalog_skin_id")
+        if raw_id not in (None, ""):
+            try:
+                catalog_id = int(raw_id)
+            except (TypeError, ValueError):
+                raise ValueError("catalog_skin_id must be an integer") from None
+            if catalog_id not in ids:
+                raise ValueError("catalog skin not found")
+            return catalog_id
+
+        name = record.get("skin")
+        if not name and record.get("weapon") and record.get("skin_name"):
+            name = f"{record['weapon']} | {record['skin_name']}"
+        if not name:
+            raise ValueError("catalog_skin_id, skin or weapon + skin_name is required")
+        key = " | ".join(part.strip() for part in str(name).split("|", 1)).casefold()
+        if key not in by_name:
+            raise ValueError(f"catalog skin not found: {name}")
+        return by_name[key]
+
+    return resolve, ids
+
+
+def _import_records(fmt: str):
+    """Yield (line, record, error) from the request body without buffering it."""
+    stream = io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            record["stattrak"] = (record.get("stattrak") or "").strip().lower() in ("1", "true", "yes", "y")
+            yield reader.line_num, record, None
+        return
+
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_no, None, "invalid JSON"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "each line must be a JSON object"
+            continue
+        yield line_no, record, None
+
+
+class PortfolioEntry(NamedTuple):
+    """The inventory columns that feed the portfolio summary."""
+
+    weapon: Optional[str]
+    rarity: Optional[str]
+    wear: Optional[str]
+    stattrak: bool
+    quantity: int
+    buy_price_eur: object
+
+
+def _portfolio_entry(weapon, rarity, values) -> PortfolioEntry:
+    """Entry from a mapping or object carrying the UserSkin columns."""
+    get = values.get if isinstance(values, dict) else partial(getattr, values)
+    return PortfolioEntry(weapon, rarity, get("wear"), bool(get("stattrak")), get("quantity"), get("buy_price_eur"))
+
+
+def _portfolio_buckets(entry: PortfolioEntry) -> tuple:
+    return (
+        ("total", ""),
+        ("weapon", entry.weapon or ""),
+        ("rarity", entry.rarity or ""),
+        ("wear", entry.wear or ""),
+        ("stattrak", "true" if entry.stattrak else "false"),
+    )
+
+
+def _dialect_insert():
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert
+
+
+def _portfolio_add(deltas: dict, entry: PortfolioEntry, sign: int = 1) -> None:
+    """Accumulate one entry into `deltas`, keyed by (dimension, bucket)."""
+    # Decimals at the column's scale: from _skin_fields or read back from the row.
+    spend = entry.buy_price_eur * entry.quantity if entry.buy_price_eur is not None else Decimal(0)
+    for key in _portfolio_buckets(entry):
+        delta = deltas.setdefault(key, [0, 0, Decimal(0)])
+        delta[0] += sign
+        delta[1] += sign * entry.quantity
+        delta[2] += sign * spend
+
+
+def _portfolio_flush(user_id: int, deltas: dict) -> None:
+    """Write accumulated deltas into the user's summary rows and clear them.
+
+    Runs in the caller's transaction as one executemany upsert of increments
+    (plus a cleanup DELETE when a bucket may have emptied), so the summary
+    commits or rolls back together with the inventory change.
+    """
+    rows = [
+        {"user_id": user_id, "dimension": dimension, "bucket": bucket, "item_count": count, "quantity": quantity, "spend_eur": spend}
+        for (dimension, bucket), (count, quantity, spend) in deltas.items()
+        if count or quantity or spend
+    ]
+    deltas.clear()
+    if not rows:
+        return
+    table = UserPortfolioSummary.__table__
+    stmt = _dialect_insert()(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.dimension, table.c.bucket],
+        set_={
+            "item_count": table.c.item_count + stmt.excluded.item_count,
+            "quantity": table.c.quantity + stmt.excluded.quantity,
+            "spend_eur": table.c.spend_eur + stmt.excluded.spend_eur,
+        },
+    )
+    db.session.execute(stmt, rows)
+    if any(row["item_count"] < 0 for row in rows):
+        db.session.execute(delete(table).where(table.c.user_id == user_id, table.c.item_count <= 0))
+
+
+def _portfolio_apply(user_id: int, removed=(), added=()) -> None:
+    """Fold inventory changes into the user's summary rows."""
+    deltas = {}
+    for sign, entries in ((-1, removed), (1, added)):
+        for entry in entries:
+            _portfolio_add(deltas, entry, sign)
+    _portfolio_flush(user_id, deltas)
+
+
+def rebuild_portfolio_summaries() -> int:
+    """Recompute every user's summary with one INSERT ... SELECT ... UNION ALL."""
+    table = UserPortfolioSummary.__table__
+    joined = UserSkin.__table__.join(SkinCatalog.__table__, SkinCatalog.id == UserSkin.catalog_skin_id)
+
+    def grouped(dimension, bucket=None):
+        # Literal SQL rather than bound parameters so the GROUP BY expression
+        # matches the selected one on Postgres.
+        query = select(
+            UserSkin.user_id,
+            literal_column(f"'{dimension}'"),
+            bucket if bucket is not None else literal_column("''"),
+            func.count(),
+            func.sum(UserSkin.quantity),
+            func.coalesce(func.sum(UserSkin.quantity * UserSkin.buy_price_eur), 0),
+        ).select_from(joined)
+        return query.group_by(UserSkin.user_id, *([bucket] if bucket is not None else []))
+
+    source = union_all(
+        grouped("total"),
+        grouped("weapon", SkinCatalog.weapon),
+        grouped("rarity", SkinCatalog.rarity),
+        grouped("wear", func.coalesce(UserSkin.wear, literal_column("''"))),
+        grouped("stattrak", case((UserSkin.stattrak, literal_column("'true'")), else_=literal_column("'false'"))),
+    )
+    db.session.execute(delete(table))
+    result = db.session.execute(
+        insert(table).from_select(["user_id", "dimension", "bucket", "item_count", "quantity", "spend_eur"], source)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def _ndjson_response(rows, **kwargs) -> Response:
+    def generate():
+        for row in rows:
+            yield current_app.json.dumps(_user_skin_to_dict(row)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson", **kwargs)
+
+
+def auth_required(fn=None, *, trust_claims: bool = False):
+    """Require a valid access token and set `g.current_user`.
+
+    With `trust_claims=True` the user is built from the token claims without a
+    lookup; use it only where the response does not depend on the user row.
+    """
+    if fn is None:
+        return lambda f: auth_required(f, trust_claims=trust_claims)
+
     @wraps(fn)
     def wrapper(*args, **kwargs):
         auth_header = request.headers.get("Authorization", "")
@@ -133,7 +646,10 @@ def auth_required(fn):
         token = auth_header.split(" ", 1)[1].strip()
         try:
             payload = _decode_token(token, "access")
-            user = User.query.get(int(payload["sub"]))
+            if trust_claims:
+                user = CurrentUser(int(payload["sub"]), payload.get("email"), payload.get("username"), None)
+            else:
+                user = _load_current_user(int(payload["sub"]))
             if not user:
                 return jsonify({"error": "user not found"}), 401
             g.current_user = user
@@ -145,505 +661,142 @@ def auth_required(fn):
     return wrapper
 
 
-@app.get("/")
-def root():
-    html = """
-<!doctype html>
-<html lang=\"en\">
-<head>
-  <meta charset=\"utf-8\" />
-  <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />
-  <title>__APP_NAME__</title>
-  <style>
-    body { font-family: Arial, sans-serif; background:#0f172a url('/assets/bg-awp-dragon-lore.jpg') center/cover fixed no-repeat; color:#e2e8f0; margin:0; }
-    .wrap { max-width: 760px; margin: 8vh auto; padding: 24px; background:#1e293b; border-radius:12px; border:1px solid #334155; }
-    .row { margin-top: 12px; }
-    button { margin-top: 14px; margin-right: 8px; padding: 8px 14px; border:0; border-radius:8px; background:#38bdf8; color:#082f49; font-weight:700; cursor:pointer; }
-    input { margin: 4px 0; width: 100%; padding: 8px; border-radius: 8px; border: 1px solid #334155; background: #0f172a; color: #e2e8f0; }
-    .grid { display:grid; grid-template-columns: 1fr 1fr; gap: 16px; }
-    pre { background:#0f172a; border:1px solid #334155; border-radius:8px; padding:10px; overflow:auto; }
-  </style>
-</head>
-<body>
-  <main class=\"wrap\">
-    <h1>Counter-Orion</h1>
-    <p id=\"msg\">Loading...</p>
-    <div class=\"row\">Service: <strong>__APP_NAME__</strong></div>
-    <div class=\"row\">Version: <strong id=\"version\">__APP_VERSION__</strong></div>
-    <div class=\"row\">Health: <strong id=\"health\">checking...</strong></div>
-
-    <h2>Login / Register</h2>
-    <div class=\"grid\">
-      <section>
-        <h3>Register</h3>
-        <input id=\"reg_email\" placeholder=\"email\" />
-        <input id=\"reg_username\" placeholder=\"username\" />
-        <input id=\"reg_password\" type=\"password\" placeholder=\"password\" />
-        <button id=\"registerBtn\">Register</button>
-      </section>
-      <section>
-        <h3>Login</h3>
-        <input id=\"login_email\" placeholder=\"email\" />
-        <input id=\"login_password\" type=\"password\" placeholder=\"password\" />
-        <button id=\"loginBtn\">Login</button>
-      </section>
-    </div>
-
-    <button id=\"profileBtn\">Go to /profile</button>
-    <button id=\"inventoryBtn\">Go to /inventory</button>
-    <button id=\"meBtn\">Call /me</button>
-    <pre id=\"output\">ready</pre>
-  </main>
-  <script>
-    const output = document.getElementById('output');
-    const setOutput = (value) => output.textContent = JSON.stringify(value, null, 2);
-
-    async function refreshMeta() {
-      const [healthRes, versionRes, msgRes] = await Promise.all([
-        fetch('/health'),
-        fetch('/version'),
-        fetch('/api/message')
-      ]);
-      const health = await healthRes.json();
-      const version = await versionRes.json();
-      const msg = await msgRes.json();
-      document.getElementById('health').textContent = health.status;
-      document.getElementById('version').textContent = version.version;
-      document.getElementById('msg').textContent = msg.message;
-    }
+def catalog_cached(fn):
+    """Serve a catalog view from the worker's response cache with a version ETag.
 
-    document.getElementById('registerBtn').addEventListener('click', async () => {
-      const payload = {
-        email: document.getElementById('reg_email').value,
-        username: document.getElementById('reg_username').value,
-        password: document.getElementById('reg_password').value,
-      };
-      const res = await fetch('/auth/register', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(payload)
-      });
-      setOutput(await res.json());
-    });
-
-    document.getElementById('loginBtn').addEventListener('click', async () => {
-      const payload = {
-        email: document.getElementById('login_email').value,
-        password: document.getElementById('login_password').value,
-      };
-      const res = await fetch('/auth/login', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(payload)
-      });
-      const data = await res.json();
-      if (data.access_token) {
-        localStorage.setItem('counter_orion_access_token', data.access_token);
-        localStorage.setItem('counter_orion_refresh_token', data.refresh_token || '');
-        window.location.href = '/profile';
-        return;
-      }
-      setOutput(data);
-    });
-
-    document.getElementById('profileBtn').addEventListener('click', () => {
-      window.location.href = '/profile';
-    });
-
-    document.getElementById('inventoryBtn').addEventListener('click', () => {
-      window.location.href = '/inventory';
-    });
-
-    document.getElementById('meBtn').addEventListener('click', async () => {
-      const accessToken = localStorage.getItem('counter_orion_access_token');
-      const res = await fetch('/me', {
-        headers: accessToken ? { 'Authorization': `Bearer ${accessToken}` } : {}
-      });
-      setOutput(await res.json());
-    });
-
-    refreshMeta();
-  </script>
-</body>
-</html>
-"""
-    html = html.replace("__APP_NAME__", APP_NAME).replace("__APP_VERSION__", APP_VERSION)
-    return Response(html, mimetype="text/html")
-
-
-@app.get("/profile")
-def profile_page():
-    html = """
-<!doctype html>
-<html lang=\"en\">
-<head>
-  <meta charset=\"utf-8\" />
-  <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />
-  <title>__APP_NAME__ / profile</title>
-  <style>
-    body { font-family: Arial, sans-serif; background:#0f172a url('/assets/bg-awp-dragon-lore.jpg') center/cover fixed no-repeat; color:#e2e8f0; margin:0; }
-    .wrap { max-width: 920px; margin: 6vh auto; padding: 24px; background:#1e293b; border-radius:12px; border:1px solid #334155; }
-    button { margin-top: 14px; margin-right: 8px; padding: 8px 14px; border:0; border-radius:8px; background:#38bdf8; color:#082f49; font-weight:700; cursor:pointer; }
-    pre { background:#0f172a; border:1px solid #334155; border-radius:8px; padding:10px; overflow:auto; }
-    table { width:100%; border-collapse: collapse; margin-top: 12px; }
-    th, td { border-bottom: 1px solid #334155; padding: 8px; text-align:left; font-size: 14px; }
-  </style>
-</head>
-<body>
-  <main class=\"wrap\">
-    <h1>Counter-Orion / Profile</h1>
-    <p>Authenticated profile page</p>
-    <pre id=\"profile\">loading...</pre>
-
-    <h3>My inventory snapshot</h3>
-    <table>
-      <thead><tr><th>ID</th><th>Weapon</th><th>Skin</th><th>Rarity</th><th>Qty</th><th>Wear</th></tr></thead>
-      <tbody id=\"profileInvBody\"></tbody>
-    </table>
-
-    <button id=\"refreshBtn\">Refresh profile</button>
-    <button id=\"inventoryBtn\">Go to /inventory</button>
-    <button id=\"logoutBtn\">Logout</button>
-    <button id=\"homeBtn\">Back to /</button>
-  </main>
-  <script>
-    const tokenKey = 'counter_orion_access_token';
-    const profileEl = document.getElementById('profile');
-    const invBody = document.getElementById('profileInvBody');
-
-    async function loadProfile() {
-      const accessToken = localStorage.getItem(tokenKey);
-      if (!accessToken) {
-        window.location.href = '/';
-        return;
-      }
-
-      const [meRes, invRes] = await Promise.all([
-        fetch('/me', { headers: { 'Authorization': `Bearer ${accessToken}` } }),
-        fetch('/skins', { headers: { 'Authorization': `Bearer ${accessToken}` } })
-      ]);
-
-      if (meRes.status === 401 || invRes.status === 401) {
-        localStorage.removeItem(tokenKey);
-        localStorage.removeItem('counter_orion_refresh_token');
-        window.location.href = '/';
-        return;
-      }
-
-      const me = await meRes.json();
-      profileEl.textContent = JSON.stringify(me, null, 2);
-
-      const inv = await invRes.json();
-      invBody.innerHTML = '';
-      for (const i of (inv.items || [])) {
-        const tr = document.createElement('tr');
-        tr.innerHTML = `<td>${i.id}</td><td>${i.weapon || ''}</td><td>${i.skin_name || ''}</td><td>${i.rarity || ''}</td><td>${i.quantity}</td><td>${i.wear || ''}</td>`;
-        invBody.appendChild(tr);
-      }
-    }
+    The ETag and the cache key are both the catalog version plus the endpoint
+    and its query arguments, so a repeat request is a 304 without touching
+    the database and a new seed changes every key at once. Only 200 responses
+    are cached. The version is the one this worker's search index last saw,
+    so a seed shows up within CATALOG_INDEX_REFRESH_SEC.
+    """
 
-    document.getElementById('refreshBtn').addEventListener('click', loadProfile);
-    document.getElementById('inventoryBtn').addEventListener('click', () => {
-      window.location.href = '/inventory';
-    });
-    document.getElementById('logoutBtn').addEventListener('click', () => {
-      localStorage.removeItem(tokenKey);
-      localStorage.removeItem('counter_orion_refresh_token');
-      window.location.href = '/';
-    });
-    document.getElementById('homeBtn').addEventListener('click', () => {
-      window.location.href = '/';
-    });
-
-    loadProfile();
-  </script>
-</body>
-</html>
-"""
-    html = html.replace("__APP_NAME__", APP_NAME)
-    return Response(html, mimetype="text/html")
-
-
-@app.get("/inventory")
-def inventory_page():
-    html = """
-<!doctype html>
-<html lang=\"en\">
-<head>
-  <meta charset=\"utf-8\" />
-  <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />
-  <title>__APP_NAME__ / inventory</title>
-  <style>
-    body { font-family: Arial, sans-serif; background:#0f172a url('/assets/bg-awp-dragon-lore.jpg') center/cover fixed no-repeat; color:#e2e8f0; margin:0; }
-    .wrap { max-width: 980px; margin: 4vh auto; padding: 24px; background:#1e293b; border-radius:12px; border:1px solid #334155; }
-    .grid { display:grid; grid-template-columns: 1fr 1fr; gap: 16px; }
-    input, select { margin: 4px 0; width: 100%; padding: 8px; border-radius: 8px; border: 1px solid #334155; background: #0f172a; color: #e2e8f0; }
-    button { margin-top: 8px; margin-right: 8px; padding: 8px 14px; border:0; border-radius:8px; background:#38bdf8; color:#082f49; font-weight:700; cursor:pointer; }
-    table { width:100%; border-collapse: collapse; margin-top: 12px; }
-    th, td { border-bottom: 1px solid #334155; padding: 8px; text-align:left; font-size: 14px; }
-    .muted { color:#94a3b8; font-size: 13px; }
-  </style>
-</head>
-<body>
-  <main class=\"wrap\">
-    <h1>Counter-Orion / Inventory</h1>
-    <div class=\"muted\">Task 5 UI: catalog search + add + inventory CRUD</div>
-
-    <div class=\"grid\">
-      <section>
-        <h3>Catalog search</h3>
-        <input id=\"q\" placeholder=\"Search (e.g. Printstream)\" />
-        <select id=\"rarity\">
-          <option value=\"\">Any rarity</option>
-          <option value=\"Covert\">Covert</option>
-          <option value=\"Extraordinary\">Extraordinary</option>
-        </select>
-        <select id=\"weapon\">
-          <option value=\"\">Any weapon</option>
-          <option>AK-47</option>
-          <option>AUG</option>
-          <option>AWP</option>
-          <option>CZ75-Auto</option>
-          <option>Desert Eagle</option>
-          <option>FAMAS</option>
-          <option>Five-SeveN</option>
-          <option>Galil AR</option>
-          <option>Glock-18</option>
-          <option>M4A1-S</option>
-          <option>M4A4</option>
-          <option>MAC-10</option>
-          <option>MP7</option>
-          <option>MP9</option>
-          <option>P2000</option>
-          <option>P250</option>
-          <option>P90</option>
-          <option>PP-Bizon</option>
-          <option>R8 Revolver</option>
-          <option>Sawed-Off</option>
-          <option>SCAR-20</option>
-          <option>SSG 08</option>
-          <option>USP-S</option>
-        </select>
-        <button id=\"searchBtn\">Search catalog</button>
-        <table>
-          <thead><tr><th>ID</th><th>Weapon</th><th>Skin</th><th>Rarity</th></tr></thead>
-          <tbody id=\"catalogBody\"></tbody>
-        </table>
-      </section>
-
-      <section>
-        <h3>Add to my inventory</h3>
-        <input id=\"skinNameSearch\" placeholder=\"Type skin name (autocomplete)\" />
-        <div id=\"skinSuggestions\" class=\"muted\"></div>
-        <input id=\"catalogSkinId\" placeholder=\"catalog_skin_id (auto-filled)\" readonly />
-        <select id=\"wear\">
-          <option value=\"\">Wear (optional)</option>
-          <option>Factory New</option>
-          <option>Minimal Wear</option>
-          <option>Field-Tested</option>
-          <option>Well-Worn</option>
-          <option>Battle-Scarred</option>
-        </select>
-        <input id=\"quantity\" type=\"number\" min=\"1\" value=\"1\" placeholder=\"quantity\" />
-        <input id=\"buyPrice\" type=\"number\" step=\"0.01\" min=\"0\" placeholder=\"buy_price_eur\" />
-        <input id=\"note\" placeholder=\"note\" />
-        <label><input id=\"stattrak\" type=\"checkbox\" style=\"width:auto;\" /> StatTrak</label>
-        <br />
-        <button id=\"addBtn\">Add item</button>
-        <button id=\"reloadBtn\">Reload inventory</button>
-      </section>
-    </div>
-
-    <h3>My inventory</h3>
-    <table>
-      <thead><tr><th>ID</th><th>Weapon</th><th>Skin</th><th>Qty</th><th>Wear</th><th>StatTrak</th><th>Note</th><th>Actions</th></tr></thead>
-      <tbody id=\"invBody\"></tbody>
-    </table>
-
-    <button id=\"homeBtn\">Back to /</button>
-    <pre id=\"output\" class=\"muted\"></pre>
-  </main>
-
-  <script>
-    const tokenKey = 'counter_orion_access_token';
-    const output = document.getElementById('output');
-    const setOutput = (v) => output.textContent = JSON.stringify(v, null, 2);
-
-    function authHeaders() {
-      const t = localStorage.getItem(tokenKey);
-      if (!t) return null;
-      return { 'Authorization': `Bearer ${t}`, 'Content-Type': 'application/json' };
-    }
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (request.endpoint, _catalog_search().current_version(), tuple(sorted(request.args.items(multi=True))))
+        etag = f"c{key[1]}-{hashlib.sha1(repr(key).encode()).hexdigest()[:16]}"
 
-    async function api(path, method='GET', body=null) {
-      const headers = authHeaders();
-      if (!headers) { window.location.href='/'; return null; }
-      const res = await fetch(path, { method, headers, body: body ? JSON.stringify(body) : null });
-      if (res.status === 401) { localStorage.removeItem(tokenKey); window.location.href='/'; return null; }
-      const data = await res.json();
-      return { ok: res.ok, data, status: res.status };
-    }
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            body = catalog_responses.get(key)
+            if body is None:
+                response = current_app.make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                catalog_responses.set(key, body)
+            response = Response(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
 
-    function renderCatalog(items) {
-      const body = document.getElementById('catalogBody');
-      body.innerHTML = '';
-      for (const i of items) {
-        const tr = document.createElement('tr');
-        tr.innerHTML = `<td>${i.id}</td><td>${i.weapon}</td><td>${i.skin_name}</td><td>${i.rarity}</td>`;
-        tr.onclick = () => {
-          document.getElementById('catalogSkinId').value = i.id;
-          document.getElementById('skinNameSearch').value = `${i.weapon} | ${i.skin_name}`;
-          document.getElementById('skinSuggestions').innerHTML = `Selected: #${i.id} ${i.weapon} | ${i.skin_name}`;
-        };
-        body.appendChild(tr);
-      }
-    }
+    return wrapper
 
-    async function autocompleteSkins() {
-      const q = document.getElementById('skinNameSearch').value.trim();
-      const suggestions = document.getElementById('skinSuggestions');
-      if (q.length < 2) {
-        suggestions.textContent = 'Type at least 2 chars...';
-        return;
-      }
-      const r = await api('/catalog/skins/search?q=' + encodeURIComponent(q) + '&limit=8');
-      if (!r || !r.ok) return;
-      const items = r.data.items || [];
-      suggestions.innerHTML = '';
-      for (const i of items) {
-        const b = document.createElement('button');
-        b.type = 'button';
-        b.textContent = `#${i.id} ${i.weapon} | ${i.skin_name} (${i.rarity})`;
-        b.style.marginTop = '4px';
-        b.onclick = () => {
-          document.getElementById('catalogSkinId').value = i.id;
-          document.getElementById('skinNameSearch').value = `${i.weapon} | ${i.skin_name}`;
-          suggestions.innerHTML = `Selected: #${i.id} ${i.weapon} | ${i.skin_name}`;
-        };
-        suggestions.appendChild(b);
-      }
-      if (!items.length) suggestions.textContent = 'No matches';
-    }
 
-    async function loadCatalog() {
-      const q = document.getElementById('q').value.trim();
-      const rarity = document.getElementById('rarity').value;
-      const weapon = document.getElementById('weapon').value;
-      const params = new URLSearchParams({ page: '1', page_size: '8' });
-      if (q) params.set('q', q);
-      if (rarity) params.set('rarity', rarity);
-      if (weapon) params.set('weapon', weapon);
-      const r = await api('/catalog/skins?' + params.toString());
-      if (!r) return;
-      if (!r.ok) return setOutput(r.data);
-      renderCatalog(r.data.items || []);
-      setOutput({ catalog_total: r.data.total, shown: (r.data.items || []).length });
-    }
+_cached_migration_heads = lru_cache(maxsize=None)(migration_heads)
 
-    function renderInventory(items) {
-      const body = document.getElementById('invBody');
-      body.innerHTML = '';
-      for (const i of items) {
-        const tr = document.createElement('tr');
-        tr.innerHTML = `
-          <td>${i.id}</td>
-          <td>${i.weapon || ''}</td>
-          <td>${i.skin_name || ''}</td>
-          <td>${i.quantity}</td>
-          <td>${i.wear || ''}</td>
-          <td>${i.stattrak ? 'yes' : 'no'}</td>
-          <td>${i.note || ''}</td>
-          <td>
-            <button data-act=\"edit\" data-id=\"${i.id}\">Edit</button>
-            <button data-act=\"del\" data-id=\"${i.id}\">Delete</button>
-          </td>
-        `;
-        body.appendChild(tr);
-      }
-
-      body.querySelectorAll('button[data-act="del"]').forEach(btn => {
-        btn.addEventListener('click', async () => {
-          const id = btn.getAttribute('data-id');
-          const r = await api('/skins/' + id, 'DELETE');
-          if (!r) return;
-          setOutput(r.data);
-          loadInventory();
-        });
-      });
-
-      body.querySelectorAll('button[data-act="edit"]').forEach(btn => {
-        btn.addEventListener('click', async () => {
-          const id = btn.getAttribute('data-id');
-          const quantity = Number(prompt('New quantity (>=1):', '1'));
-          if (!quantity || quantity < 1) return;
-          const note = prompt('New note:', 'updated via UI');
-          const r = await api('/skins/' + id, 'PUT', { quantity, note });
-          if (!r) return;
-          setOutput(r.data);
-          loadInventory();
-        });
-      });
-    }
 
-    async function loadInventory() {
-      const r = await api('/skins');
-      if (!r) return;
-      if (!r.ok) return setOutput(r.data);
-      renderInventory(r.data.items || []);
-      setOutput({ inventory_total: r.data.total });
-    }
+def _readiness_checks(app: Flask) -> dict:
+    def database():
+        db.session.execute(text("SELECT 1"))
+        return {"ok": True}
 
-    document.getElementById('searchBtn').addEventListener('click', loadCatalog);
-    document.getElementById('skinNameSearch').addEventListener('input', autocompleteSkins);
-    document.getElementById('reloadBtn').addEventListener('click', loadInventory);
-    document.getElementById('homeBtn').addEventListener('click', () => window.location.href='/');
-
-    document.getElementById('addBtn').addEventListener('click', async () => {
-      const payload = {
-        catalog_skin_id: Number(document.getElementById('catalogSkinId').value),
-        wear: document.getElementById('wear').value,
-        quantity: Number(document.getElementById('quantity').value || 1),
-        buy_price_eur: document.getElementById('buyPrice').value || null,
-        note: document.getElementById('note').value,
-        stattrak: document.getElementById('stattrak').checked,
-      };
-      const r = await api('/skins', 'POST', payload);
-      if (!r) return;
-      setOutput(r.data);
-      if (r.ok) loadInventory();
-    });
-
-    loadCatalog();
-    loadInventory();
-  </script>
-</body>
-</html>
-"""
-    html = html.replace("__APP_NAME__", APP_NAME)
-    return Response(html, mimetype="text/html")
-
-
-@app.get("/assets/bg-awp-dragon-lore.jpg")
-def bg_awp_dragon_lore():
-    return send_file("data/bg-awp-dragon-lore.jpg", mimetype="image/jpeg")
-
-
-@app.get("/health")
+    def pool():
+        stats = pool_stats.snapshot(db.engine.pool)
+        capacity = stats.get("size", 0) + stats.get("max_overflow", 0)
+        saturation = round(stats["checked_out"] / capacity, 3) if capacity else 0.0
+        return {"ok": saturation < 1.0, "saturation": saturation, "checked_out": stats.get("checked_out")}
+
+    def migrations():
+        heads = _cached_migration_heads(os.path.join(app.root_path, "migrations"))
+        current = {row[0] for row in db.session.execute(text("SELECT version_num FROM alembic_version"))}
+        return {"ok": current == heads, "current": sorted(current), "head": sorted(heads)}
+
+    def catalog_index():
+        # Probing also warms the worker's search index before traffic needs it.
+        search = app.extensions["catalog_search"]
+        return {"ok": True, "entries": len(search.index()), "version": search.version}
+
+    return {"database": database, "pool": pool, "migrations": migrations, "catalog_index": catalog_index}
+
+
+@bp.before_app_request
+def _start_background_threads():
+    # No-ops once running; under gunicorn post_fork has started them already.
+    current_app.extensions["catalog_search"].ensure_started()
+    current_app.extensions["readiness"].ensure_started()
+
+
+@bp.app_errorhandler(HashingOverloaded)
+def hashing_overloaded(exc):
+    response = jsonify({"error": "server busy, retry shortly"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+
+@bp.get("/")
+def root():
+    return current_app.extensions["pages"]["index"].response()
+
+
+@bp.get("/profile")
+def profile_page():
+    return current_app.extensions["pages"]["profile"].response()
+
+
+@bp.get("/inventory")
+def inventory_page():
+    return current_app.extensions["pages"]["inventory"].response()
+
+
+@bp.get("/assets/<path:filename>")
+def asset(filename: str):
+    return current_app.extensions["assets"].response(filename)
+
+
+@bp.get("/health")
 def health():
     return jsonify({"status": "healthy"})
 
 
-@app.get("/version")
+@bp.get("/ready")
+def ready():
+    is_ready, body = current_app.extensions["readiness"].status()
+    return jsonify(body), 200 if is_ready else 503
+
+
+@bp.get("/version")
 def version():
     return jsonify({"app": APP_NAME, "version": APP_VERSION})
 
 
-@app.get("/api/message")
+@bp.get("/stats/caches")
+# Claims only, so reading the stats does not move the user cache counters.
+@auth_required(trust_claims=True)
+def cache_stats():
+    return jsonify(
+        {
+            "tokens": token_cache.stats(),
+            "users": user_cache.stats(),
+            "catalog_totals": catalog_totals.stats(),
+            "catalog_responses": catalog_responses.stats(),
+        }
+    )
+
+
+@bp.get("/stats/db-pool")
+@auth_required(trust_claims=True)
+def db_pool_stats():
+    return jsonify(pool_stats.snapshot(db.engine.pool))
+
+
+@bp.get("/api/message")
 def message():
     return jsonify({"message": "Counter-Orion auth scaffold is live 🚀"})
 
 
-@app.post("/auth/register")
+@bp.post("/auth/register")
 def register():
     data = request.get_json(silent=True) or {}
     email = (data.get("email") or "").strip().lower()
@@ -664,7 +817,7 @@ def register():
     return jsonify({"id": user.id, "email": user.email, "username": user.username}), 201
 
 
-@app.post("/auth/login")
+@bp.post("/auth/login")
 def login():
     data = request.get_json(silent=True) or {}
     email = (data.get("email") or "").strip().lower()
@@ -674,6 +827,11 @@ def login():
     if not user or not user.check_password(password):
         return jsonify({"error": "invalid credentials"}), 401
 
+    # Upgrade hashes made with older PASSWORD_HASH_METHOD parameters while we have the plaintext.
+    if user.password_needs_rehash():
+        user.set_password(password)
+        db.session.commit()
+
     return jsonify(
         {
             "access_token": _create_token(user, "access"),
@@ -683,7 +841,7 @@ def login():
     )
 
 
-@app.post("/auth/refresh")
+@bp.post("/auth/refresh")
 def refresh():
     data = request.get_json(silent=True) or {}
     refresh_token = data.get("refresh_token") or ""
@@ -702,7 +860,7 @@ def refresh():
     return jsonify({"access_token": _create_token(user, "access"), "token_type": "Bearer"})
 
 
-@app.get("/me")
+@bp.get("/me")
 @auth_required
 def me():
     user = g.current_user
@@ -716,31 +874,67 @@ def me():
     )
 
 
-@app.get("/catalog/skins")
-@auth_required
+@bp.get("/catalog/skins")
+@auth_required(trust_claims=True)
+@catalog_cached
 def catalog_skins():
+    # Presence of `cursor` (empty for the first page) switches to keyset paging.
+    cursor = request.args.get("cursor")
     page = max(1, int(request.args.get("page", 1)))
     page_size = min(100, max(1, int(request.args.get("page_size", 20))))
+    include_total = _arg_flag("include_total", True)
     weapon = (request.args.get("weapon") or "").strip()
     rarity = (request.args.get("rarity") or "").strip()
     q = (request.args.get("q") or "").strip()
 
-    query = SkinCatalog.query
+    # Plain row tuples: the page only needs these columns, not ORM objects.
+    query = db.session.query(SkinCatalog.id, SkinCatalog.weapon, SkinCatalog.skin_name, SkinCatalog.rarity)
     if weapon:
         query = query.filter(SkinCatalog.weapon == weapon)
     if rarity:
         query = query.filter(SkinCatalog.rarity == rarity)
     if q:
-        pattern = f"%{q}%"
-        query = query.filter((SkinCatalog.skin_name.ilike(pattern)) | (SkinCatalog.weapon.ilike(pattern)))
-
-    total = query.count()
-    items = (
-        query.order_by(SkinCatalog.weapon.asc(), SkinCatalog.skin_name.asc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
+        query = query.filter(_catalog_text_filter(q))
+
+    order = (SkinCatalog.weapon.asc(), SkinCatalog.skin_name.asc(), SkinCatalog.id.asc())
+
+    if cursor is not None:
+        if cursor:
+            try:
+                after_weapon, after_skin_name, after_id = _decode_cursor(cursor, (str, str, int))
+            except ValueError:
+                return jsonify({"error": "invalid cursor"}), 400
+            query = query.filter(
+                tuple_(SkinCatalog.weapon, SkinCatalog.skin_name, SkinCatalog.id)
+                > tuple_(after_weapon, after_skin_name, after_id)
+            )
+        rows = query.order_by(*order).limit(page_size + 1).all()
+        items = rows[:page_size]
+        has_next = len(rows) > page_size
+        last = items[-1] if items else None
+        return jsonify(
+            {
+                "items": [_catalog_to_dict(i) for i in items],
+                "page_size": page_size,
+                "has_next": has_next,
+                "next_cursor": _encode_cursor((last.weapon, last.skin_name, last.id)) if has_next else None,
+            }
+        )
+
+    page_query = query.order_by(*order).offset((page - 1) * page_size)
+    if not include_total:
+        rows = page_query.limit(page_size + 1).all()
+        items = rows[:page_size]
+        total = None
+        has_next = len(rows) > page_size
+    else:
+        totals_key = (_catalog_search().current_version(), weapon, rarity, q.lower())
+        total = catalog_totals.get(totals_key)
+        if total is None:
+            total = query.count()
+            catalog_totals.set(totals_key, total)
+        items = page_query.limit(page_size).all()
+        has_next = (page * page_size) < total
 
     return jsonify(
         {
@@ -748,44 +942,68 @@ def catalog_skins():
             "page": page,
             "page_size": page_size,
             "total": total,
-            "has_next": (page * page_size) < total,
+            "has_next": has_next,
         }
     )
 
 
-@app.get("/catalog/skins/search")
-@auth_required
+@bp.get("/catalog/skins/search")
+@auth_required(trust_claims=True)
+@catalog_cached
 def catalog_skins_search():
     q = (request.args.get("q") or "").strip()
     if len(q) < 2:
         return jsonify({"error": "q must be at least 2 characters"}), 400
 
     limit = min(50, max(1, int(request.args.get("limit", 20))))
-    pattern = f"%{q}%"
-
-    items = (
-        SkinCatalog.query.filter((SkinCatalog.skin_name.ilike(pattern)) | (SkinCatalog.weapon.ilike(pattern)))
-        .order_by(SkinCatalog.weapon.asc(), SkinCatalog.skin_name.asc())
-        .limit(limit)
-        .all()
-    )
+    items = _catalog_search().search(q, limit)
 
     return jsonify({"items": [_catalog_to_dict(i) for i in items], "limit": limit, "count": len(items)})
 
 
-@app.get("/skins")
+@bp.get("/skins")
 @auth_required
 def my_skins():
     user = g.current_user
-    items = (
-        UserSkin.query.filter_by(user_id=user.id)
-        .order_by(UserSkin.created_at.desc())
-        .all()
+    cursor = request.args.get("cursor")
+
+    # The cursor carries created_at exactly as the database renders it and is
+    # bound as text, so the seek compares like ORDER BY does on both Postgres
+    # and SQLite (which stores timestamps as text).
+    created_at_key = cast(UserSkin.created_at, db.String).label("created_at_key")
+    query = _user_skin_rows(created_at_key).filter(UserSkin.user_id == user.id)
+    if cursor:
+        try:
+            before_created_at, before_id = _decode_cursor(cursor, (str, int))
+        except ValueError:
+            return jsonify({"error": "invalid cursor"}), 400
+        query = query.filter(
+            tuple_(UserSkin.created_at, UserSkin.id) < tuple_(literal(before_created_at, db.String), before_id)
+        )
+    query = query.order_by(UserSkin.created_at.desc(), UserSkin.id.desc())
+
+    if request.accept_mimetypes.best_match(["application/json", "application/x-ndjson"]) == "application/x-ndjson":
+        return _ndjson_response(query.yield_per(SKINS_STREAM_BATCH_SIZE))
+
+    if cursor is None:
+        items = query.all()
+        return jsonify({"items": [_user_skin_to_dict(i) for i in items], "total": len(items)})
+
+    page_size = min(SKINS_MAX_PAGE_SIZE, max(1, int(request.args.get("page_size", 50))))
+    rows = query.limit(page_size + 1).all()
+    items = rows[:page_size]
+    has_next = len(rows) > page_size
+    return jsonify(
+        {
+            "items": [_user_skin_to_dict(i) for i in items],
+            "page_size": page_size,
+            "has_next": has_next,
+            "next_cursor": _encode_cursor((items[-1].created_at_key, items[-1].id)) if has_next else None,
+        }
     )
-    return jsonify({"items": [_user_skin_to_dict(i) for i in items], "total": len(items)})
 
 
-@app.post("/skins")
+@bp.post("/skins")
 @auth_required
 def add_skin():
     user = g.current_user
@@ -799,80 +1017,378 @@ def add_skin():
     if not catalog_skin:
         return jsonify({"error": "catalog skin not found"}), 404
 
-    quantity = int(data.get("quantity", 1))
-    if quantity < 1:
-        return jsonify({"error": "quantity must be >= 1"}), 400
+    try:
+        fields = _skin_fields(data)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    item = UserSkin(user_id=user.id, catalog_skin_id=catalog_skin.id, **fields)
+    db.session.add(item)
+    _portfolio_apply(user.id, added=[_portfolio_entry(catalog_skin.weapon, catalog_skin.rarity, fields)])
+    db.session.commit()
+
+    return jsonify(_user_skin_to_dict(_user_skin_row(item.id))), 201
+
 
-    buy_price = data.get("buy_price_eur")
-    if buy_price is not None and str(buy_price).strip() != "":
-        buy_price = float(buy_price)
-        if buy_price < 0:
-            return jsonify({"error": "buy_price_eur must be >= 0"}), 400
+@bp.post("/skins/import")
+@auth_required
+def import_skins():
+    """Bulk-add inventory rows from a streamed CSV or NDJSON body.
+
+    Rows are inserted in batches inside one transaction. Any invalid row rolls
+    the whole import back (422) unless `skip_invalid=1`, in which case the
+    valid rows are kept and the rest reported.
+    """
+    user = g.current_user
+    if request.mimetype == "text/csv":
+        fmt = "csv"
+    elif request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        fmt = "ndjson"
     else:
-        buy_price = None
-
-    item = UserSkin(
-        user_id=user.id,
-        catalog_skin_id=catalog_skin.id,
-        wear=(data.get("wear") or "").strip() or None,
-        stattrak=bool(data.get("stattrak", False)),
-        quantity=quantity,
-        note=(data.get("note") or "").strip() or None,
-        buy_price_eur=buy_price,
+        return jsonify({"error": "send text/csv or application/x-ndjson"}), 415
+    skip_invalid = _arg_flag("skip_invalid", False)
+
+    resolve, catalog = _catalog_resolver()
+    insert_stmt = insert(UserSkin.__table__)
+    pending = []
+    # Running summary deltas: bounded by the number of buckets, not rows.
+    deltas = {}
+    imported = 0
+    failed = 0
+    errors = []
+    for line, record, error in _import_records(fmt):
+        if error is None:
+            try:
+                row = {"user_id": user.id, "catalog_skin_id": resolve(record), **_skin_fields(record)}
+            except ValueError as exc:
+                error = str(exc)
+        if error is not None:
+            failed += 1
+            if len(errors) < SKINS_IMPORT_MAX_ERRORS:
+                errors.append({"line": line, "error": error})
+            continue
+        if failed and not skip_invalid:
+            # The import will be rolled back; keep validating but stop writing.
+            continue
+        pending.append(row)
+        _portfolio_add(deltas, _portfolio_entry(*catalog[row["catalog_skin_id"]], row))
+        if len(pending) >= SKINS_IMPORT_BATCH_SIZE:
+            db.session.execute(insert_stmt, pending)
+            _portfolio_flush(user.id, deltas)
+            imported += len(pending)
+            pending = []
+
+    if failed and not skip_invalid:
+        db.session.rollback()
+        return jsonify({"imported": 0, "failed": failed, "errors": errors}), 422
+
+    if pending:
+        db.session.execute(insert_stmt, pending)
+        _portfolio_flush(user.id, deltas)
+        imported += len(pending)
+    db.session.commit()
+    return jsonify({"imported": imported, "failed": failed, "errors": errors}), 201 if imported else 200
+
+
+@bp.get("/skins/export")
+@auth_required
+def export_skins():
+    user = g.current_user
+    fmt = request.args.get("format", "csv")
+    rows = (
+        _user_skin_rows()
+        .filter(UserSkin.user_id == user.id)
+        .order_by(UserSkin.id)
+        .yield_per(SKINS_STREAM_BATCH_SIZE)
     )
-    db.session.add(item)
+
+    if fmt == "ndjson":
+        headers = {"Content-Disposition": "attachment; filename=inventory.ndjson"}
+        return _ndjson_response(rows, headers=headers)
+    if fmt != "csv":
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(SKINS_EXPORT_COLUMNS)
+        for count, row in enumerate(rows, 1):
+            item = _user_skin_to_dict(row)
+            writer.writerow([item[name] for name in SKINS_EXPORT_COLUMNS])
+            if count % SKINS_STREAM_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=inventory.csv"},
+    )
+
+
+def _batch_item_id(op: dict) -> int:
+    try:
+        return int(op["id"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("id must be an integer") from None
+
+
+@bp.post("/skins/batch")
+@auth_required
+def batch_skins():
+    """Apply create/update/delete operations in one transaction.
+
+    Every operation is validated first (same rules as POST/PUT /skins) and
+    nothing is written if any fails. Updated and deleted entries are locked
+    and read back in one UPDATE ... RETURNING, so summary deltas reflect the
+    values being replaced. Writes are then one DELETE, one executemany UPDATE
+    by primary key and one INSERT ... RETURNING.
+    """
+    user = g.current_user
+    data = request.get_json(silent=True) or {}
+    operations = data.get("operations")
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "operations must be a non-empty list"}), 400
+    if len(operations) > SKINS_BATCH_MAX_OPERATIONS:
+        return jsonify({"error": f"at most {SKINS_BATCH_MAX_OPERATIONS} operations per batch"}), 400
+
+    errors = []
+    creates, updates, deletes = [], [], []
+    seen_ids = set()
+    for index, op in enumerate(operations):
+        try:
+            if not isinstance(op, dict):
+                raise ValueError("operation must be an object")
+            kind = op.get("op")
+            if kind == "create":
+                try:
+                    catalog_skin_id = int(op["catalog_skin_id"])
+                except (KeyError, TypeError, ValueError):
+                    raise ValueError("catalog_skin_id is required") from None
+                creates.append((index, {"user_id": user.id, "catalog_skin_id": catalog_skin_id, **_skin_fields(op)}))
+                continue
+            if kind not in ("update", "delete"):
+                raise ValueError("op must be create, update or delete")
+            skin_id = _batch_item_id(op)
+            if skin_id in seen_ids:
+                raise ValueError("id appears in more than one operation")
+            seen_ids.add(skin_id)
+            if kind == "update":
+                updates.append((index, {"id": skin_id, **_skin_fields(op, partial=True)}))
+            else:
+                deletes.append((index, skin_id))
+        except ValueError as exc:
+            errors.append({"index": index, "error": str(exc)})
+
+    owned = {}
+    if seen_ids:
+        owned = _lock_user_skins(user.id, seen_ids)
+        for index, skin_id in [(i, v["id"]) for i, v in updates] + deletes:
+            if skin_id not in owned:
+                errors.append({"index": index, "error": "skin entry not found"})
+    known = {}
+    if creates:
+        wanted = {values["catalog_skin_id"] for _, values in creates}
+        known = {
+            catalog_id: (weapon, rarity)
+            for catalog_id, weapon, rarity in db.session.execute(
+                select(SkinCatalog.id, SkinCatalog.weapon, SkinCatalog.rarity).where(SkinCatalog.id.in_(wanted))
+            )
+        }
+        for index, values in creates:
+            if values["catalog_skin_id"] not in known:
+                errors.append({"index": index, "error": "catalog skin not found"})
+    if errors:
+        db.session.rollback()
+        return jsonify({"errors": sorted(errors, key=lambda e: e["index"])}), 422
+
+    removed, added = [], []
+    for _, skin_id in deletes:
+        row = owned[skin_id]
+        removed.append(_portfolio_entry(row.weapon, row.rarity, row))
+    for _, values in updates:
+        row = owned[values["id"]]
+        before = _portfolio_entry(row.weapon, row.rarity, row)
+        after = before._replace(**{k: v for k, v in values.items() if k in PortfolioEntry._fields})
+        if after != before:
+            removed.append(before)
+            added.append(after)
+    for _, values in creates:
+        added.append(_portfolio_entry(*known[values["catalog_skin_id"]], values))
+
+    if deletes:
+        db.session.execute(
+            delete(UserSkin)
+            .where(UserSkin.user_id == user.id, UserSkin.id.in_([skin_id for _, skin_id in deletes]))
+            .execution_options(synchronize_session=False)
+        )
+    updated_ids = [values["id"] for _, values in updates]
+    # Rows with no changed fields still count as updated but need no statement.
+    changed = [values for _, values in updates if len(values) > 1]
+    if changed:
+        db.session.execute(update(UserSkin), changed)
+    created_ids = []
+    if creates:
+        table = UserSkin.__table__
+        created_ids = list(
+            db.session.scalars(
+                insert(table).returning(table.c.id, sort_by_parameter_order=True),
+                [values for _, values in creates],
+            )
+        )
+    _portfolio_apply(user.id, removed=removed, added=added)
+    rows = {}
+    if created_ids or updated_ids:
+        rows = {row.id: row for row in _user_skin_rows().filter(UserSkin.id.in_(created_ids + updated_ids))}
     db.session.commit()
 
-    return jsonify(_user_skin_to_dict(item)), 201
+    return jsonify(
+        {
+            "created": [_user_skin_to_dict(rows[i]) for i in created_ids],
+            "updated": [_user_skin_to_dict(rows[i]) for i in updated_ids],
+            "deleted": [skin_id for _, skin_id in deletes],
+        }
+    )
 
 
-@app.put("/skins/<int:skin_id>")
+@bp.put("/skins/<int:skin_id>")
 @auth_required
 def update_skin(skin_id: int):
     user = g.current_user
-    item = UserSkin.query.filter_by(id=skin_id, user_id=user.id).first()
-    if not item:
+    row = _lock_user_skins(user.id, [skin_id]).get(skin_id)
+    if row is None:
+        db.session.rollback()
         return jsonify({"error": "skin entry not found"}), 404
 
     data = request.get_json(silent=True) or {}
-
-    if "wear" in data:
-        item.wear = (data.get("wear") or "").strip() or None
-    if "stattrak" in data:
-        item.stattrak = bool(data.get("stattrak"))
-    if "quantity" in data:
-        q = int(data.get("quantity"))
-        if q < 1:
-            return jsonify({"error": "quantity must be >= 1"}), 400
-        item.quantity = q
-    if "note" in data:
-        item.note = (data.get("note") or "").strip() or None
-    if "buy_price_eur" in data:
-        val = data.get("buy_price_eur")
-        if val is None or str(val).strip() == "":
-            item.buy_price_eur = None
-        else:
-            val = float(val)
-            if val < 0:
-                return jsonify({"error": "buy_price_eur must be >= 0"}), 400
-            item.buy_price_eur = val
-
+    try:
+        fields = _skin_fields(data, partial=True)
+    except ValueError as exc:
+        db.session.rollback()
+        return jsonify({"error": str(exc)}), 400
+    if fields:
+        db.session.execute(
+            update(UserSkin)
+            .where(UserSkin.id == skin_id)
+            .values(**fields)
+            .execution_options(synchronize_session=False)
+        )
+    before = _portfolio_entry(row.weapon, row.rarity, row)
+    after = before._replace(**{k: v for k, v in fields.items() if k in PortfolioEntry._fields})
+    if after != before:
+        _portfolio_apply(user.id, removed=[before], added=[after])
+
+    # Read back before committing: a concurrent delete may land right after.
+    body = _user_skin_to_dict(_user_skin_row(skin_id))
     db.session.commit()
-    return jsonify(_user_skin_to_dict(item))
+    return jsonify(body)
 
 
-@app.delete("/skins/<int:skin_id>")
+@bp.delete("/skins/<int:skin_id>")
 @auth_required
 def delete_skin(skin_id: int):
     user = g.current_user
-    item = UserSkin.query.filter_by(id=skin_id, user_id=user.id).first()
-    if not item:
+    table = UserSkin.__table__
+    # The summary delta comes from the row this statement removed, so a
+    # concurrent delete of the same entry cannot be counted twice.
+    row = db.session.execute(
+        delete(table).where(table.c.id == skin_id, table.c.user_id == user.id).returning(*_portfolio_returning(table))
+    ).first()
+    if row is None:
+        db.session.rollback()
         return jsonify({"error": "skin entry not found"}), 404
 
-    db.session.delete(item)
+    _portfolio_apply(user.id, removed=[_portfolio_entry(row.weapon, row.rarity, row)])
     db.session.commit()
     return jsonify({"deleted": True, "id": skin_id})
 
 
+@bp.get("/portfolio/summary")
+@auth_required(trust_claims=True)
+def portfolio_summary():
+    rows = (
+        db.session.query(
+            UserPortfolioSummary.dimension,
+            UserPortfolioSummary.bucket,
+            UserPortfolioSummary.item_count,
+            UserPortfolioSummary.quantity,
+            UserPortfolioSummary.spend_eur,
+        )
+        .filter(UserPortfolioSummary.user_id == g.current_user.id)
+        .order_by(UserPortfolioSummary.dimension, UserPortfolioSummary.bucket)
+    )
+
+    body = {
+        "totals": {"items": 0, "quantity": 0, "spend_eur": 0.0},
+        "by_weapon": [],
+        "by_rarity": [],
+        "by_wear": [],
+        "by_stattrak": [],
+    }
+    for dimension, bucket, item_count, quantity, spend_eur in rows:
+        totals = {"items": item_count, "quantity": quantity, "spend_eur": float(spend_eur)}
+        if dimension == "total":
+            body["totals"] = totals
+            continue
+        if dimension == "stattrak":
+            bucket = bucket == "true"
+        elif dimension == "wear":
+            bucket = bucket or None
+        body[f"by_{dimension}"].append({dimension: bucket, **totals})
+    return jsonify(body)
+
+
+def create_app() -> Flask:
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config["SQLALCHEMY_DATABASE_URI"] = sqlite_database_url(raw_db_url)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(raw_db_url)
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+
+    db.init_app(app)
+    if raw_db_url.startswith("sqlite"):
+        with app.app_context():
+            install_sqlite_pragmas(db.engine)
+
+    assets = AssetManifest()
+    replacements = {
+        "__APP_NAME__": APP_NAME,
+        "__APP_VERSION__": APP_VERSION,
+        "__BACKGROUND_CSS__": assets.background_css("body", "bg-awp-dragon-lore.jpg"),
+    }
+    app.extensions["assets"] = assets
+    app.extensions["pages"] = {
+        "index": render_page("index.html", replacements),
+        "profile": render_page("profile.html", replacements),
+        "inventory": render_page("inventory.html", replacements),
+    }
+    app.extensions["catalog_search"] = CatalogSearch(
+        partial(_load_catalog_entries, app),
+        partial(_load_catalog_version, app),
+        refresh_interval=CATALOG_INDEX_REFRESH_SEC,
+    )
+
+    app.extensions["readiness"] = ReadinessProber(
+        app,
+        _readiness_checks(app),
+        interval=READY_PROBE_INTERVAL_SEC,
+        required=("database", "migrations", "catalog_index"),
+    )
+
+    sql_tracing.init_app(app)
+    metrics.init_app(app)
+    app.register_blueprint(bp)
+    return app
+
+
+def init_migrations(app: Flask) -> None:
+    """Attach the `flask db` commands; only the management CLI needs alembic."""
+    from flask_migrate import Migrate
+
+    Migrate(app, db)
+
+
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8080)
+    create_app().run(host="0.0.0.0", port=8080)
@@ -0,0 +1,96 @@
+"""Fingerprinted static assets.
+
+At startup every image under `data/` (and the resized variants written to
+`build/assets/` by `scripts/build_assets.py`) is hashed and published under a
+content-addressed name such as `bg-awp-dragon-lore.3f2a1b9c0d4e.jpg`. Those URLs
+never change meaning, so they are served with `Cache-Control: immutable`;
+Range and conditional requests are handled by `send_file`.
+"""
+import hashlib
+import mimetypes
+import re
+from pathlib import Path
+
+from flask import abort, send_file
+
+ROOT = Path(__file__).resolve().parent
+SOURCE_DIR = ROOT / "data"
+VARIANTS_DIR = ROOT / "build" / "assets"
+ASSET_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".svg"}
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+LEGACY_MAX_AGE = 3600
+
+# Variant files are named "<stem>-<width>w.<ext>" by scripts/build_assets.py.
+_VARIANT_NAME = re.compile(r"^(?P<stem>.+)-(?P<width>\d+)w\.(?P<ext>[a-z]+)$")
+
+
+def _digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()[:12]
+
+
+class AssetManifest:
+    def __init__(self, directories=(SOURCE_DIR, VARIANTS_DIR)):
+        self._by_name = {}  # logical name -> fingerprinted name
+        self._paths = {}  # fingerprinted name -> file on disk
+        self._variants = {}  # source stem -> [(width, ext, fingerprinted name)]
+
+        for directory in directories:
+            if not directory.is_dir():
+                continue
+            for path in sorted(directory.iterdir()):
+                if path.suffix.lower() not in ASSET_SUFFIXES or not path.is_file():
+                    continue
+                hashed = f"{path.stem}.{_digest(path)}{path.suffix}"
+                self._by_name[path.name] = hashed
+                self._paths[hashed] = path
+                match = _VARIANT_NAME.match(path.name)
+                if match and directory == VARIANTS_DIR:
+                    self._variants.setdefault(match["stem"], []).append((int(match["width"]), match["ext"], hashed))
+
+    def url(self, name: str) -> str:
+        return f"/assets/{self._by_name.get(name, name)}"
+
+    def background_css(self, selector: str, name: str) -> str:
+        """CSS for a full-page background that downloads a width-appropriate variant.
+
+        Smaller viewports get the narrower variants through media queries, and
+        browsers that understand image-set() pick WebP over JPEG.
+        """
+        original = self.url(name)
+        original_type = mimetypes.guess_type(name)[0] or "image/jpeg"
+        by_width = {}
+        for width, ext, hashed in self._variants.get(Path(name).stem, []):
+            by_width.setdefault(width, {})[ext] = f"/assets/{hashed}"
+
+        base = f"{selector} {{ background-image: url('{original}'); }}"
+        media_rules = []
+        for width in sorted(by_width, reverse=True):
+            formats = by_width[width]
+            # Full-width variants only come as WebP; pair them with the original.
+            fallback, fallback_type = (formats["jpg"], "image/jpeg") if "jpg" in formats else (original, original_type)
+            candidates = [f"url('{formats['webp']}') type('image/webp')"] if "webp" in formats else []
+            candidates.append(f"url('{fallback}') type('{fallback_type}')")
+            declarations = f"background-image: url('{fallback}'); background-image: image-set({', '.join(candidates)});"
+            if "jpg" in formats:
+                media_rules.append(f"@media (max-width: {width}px) {{ {selector} {{ {declarations} }} }}")
+            else:
+                base = f"{selector} {{ {declarations} }}"
+        return "\n    ".join([base] + media_rules)
+
+    def response(self, filename: str):
+        path = self._paths.get(filename)
+        if path is not None:
+            response = send_file(path, conditional=True, etag=True, max_age=IMMUTABLE_MAX_AGE)
+            response.cache_control.immutable = True
+            response.cache_control.public = True
+            return response
+
+        # Un-fingerprinted names keep working for old pages and bookmarks.
+        hashed = self._by_name.get(filename)
+        if hashed is None:
+            abort(404)
+        return send_file(self._paths[hashed], conditional=True, etag=True, max_age=LEGACY_MAX_AGE)
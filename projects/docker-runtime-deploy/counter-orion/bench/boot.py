@@ -0,0 +1,124 @@
+"""Boot benchmark: `import app` cost and time to the first 200 from `/health`.
+
+Two measurements, each repeated and reported as the best run:
+- import: `python -X importtime -c "import app"`, with the slowest modules by
+  cumulative time, so a new heavyweight top-level import is easy to spot;
+- first 200: `python serving.py` (the container entrypoint) started with one
+  worker on a free local port, polled until `/health` answers.
+
+Exits non-zero when either exceeds its budget, so it can gate CI.
+
+Usage:
+    python bench/boot.py [--runs 3] [--import-budget-ms 1000] [--budget-ms 1500] [--top 10]
+"""
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure_import() -> tuple:
+    """(total_ms, [(cumulative_ms, module), ...]) for one `import app`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT,
+        env={**os.environ, "DATABASE_URL": "sqlite://"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            cumulative_ms = int(match.group(2)) / 1000
+            depth = len(match.group(3)) // 2
+            modules.append((cumulative_ms, depth, match.group(4)))
+    total = next(ms for ms, depth, name in reversed(modules) if name == "app" and depth == 0)
+    top_level = sorted(((ms, name) for ms, depth, name in modules if depth == 1), reverse=True)
+    return total, top_level
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_first_200(timeout: float) -> float:
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{tmp}/boot.db",
+            "PROMETHEUS_MULTIPROC_DIR": f"{tmp}/prometheus",
+            "WEB_BIND": f"127.0.0.1:{port}",
+            "WEB_CONCURRENCY": "1",
+        }
+        url = f"http://127.0.0.1:{port}/health"
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "serving.py"],
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            while time.perf_counter() - start < timeout:
+                if server.poll() is not None:
+                    raise RuntimeError(f"serving.py exited with {server.returncode}")
+                try:
+                    with urllib.request.urlopen(url, timeout=1) as resp:
+                        if resp.status == 200:
+                            return (time.perf_counter() - start) * 1000
+                except (urllib.error.URLError, ConnectionError):
+                    pass
+                time.sleep(0.01)
+            raise RuntimeError(f"no 200 from {url} within {timeout:.0f}s")
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--import-budget-ms", type=float, default=1000)
+    parser.add_argument("--budget-ms", type=float, default=1500, help="time to first 200 on /health")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    import_ms, top_level = min(imports)
+    first_200_ms = min(measure_first_200(args.timeout) for _ in range(args.runs))
+
+    print(f"import app:        {import_ms:8.1f} ms   (budget {args.import_budget_ms:.0f} ms)")
+    for ms, name in top_level[: args.top]:
+        print(f"  {name:32} {ms:8.1f} ms")
+    print(f"first 200 /health: {first_200_ms:8.1f} ms   (budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import app took {import_ms:.0f} ms > {args.import_budget_ms:.0f} ms")
+    if first_200_ms > args.budget_ms:
+        failures.append(f"first 200 took {first_200_ms:.0f} ms > {args.budget_ms:.0f} ms")
+    if failures:
+        print("BOOT BUDGET EXCEEDED: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
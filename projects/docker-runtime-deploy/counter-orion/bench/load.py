@@ -0,0 +1,331 @@
+"""HTTP load test: drive API scenarios concurrently and report latency per endpoint.
+
+Scenarios (each runs `--runs` times for `--duration` seconds with
+`--concurrency` threads, one keep-alive connection per thread, against users
+from bench/seed_synthetic.py; the run with the most requests is reported, as
+the least disturbed by whatever else the machine was doing):
+- login_storm: POST /auth/login for random users;
+- autocomplete: a search request per keystroke while typing a skin word;
+- inventory_reload: what /inventory fetches on load (page, /skins, first
+  catalog page) plus /portfolio/summary;
+- bulk_edits: create, update and delete 20 entries through /skins/batch.
+
+The report is JSON on stdout (or `--output`): requests, errors, RPS and
+p50/p95/p99 per endpoint and scenario. With `--baseline`, endpoints whose p95
+grew or RPS fell by more than `--tolerance`, or whose error rate rose by more
+than a percentage point, are listed on stderr and the exit status is 1. `--save-baseline` stores the report
+as the new baseline instead.
+
+Usage:
+    python bench/load.py --serve [--scenarios login_storm,autocomplete]
+        [--runs 3] [--duration 5] [--concurrency 8] [--users 200]
+        [--baseline bench/baseline.json] [--save-baseline]
+    python bench/load.py --base-url http://localhost:8082 ...
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from synthetic_data import DEFAULT_PASSWORD, SKIN_WORDS, WEARS, user_email
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+BATCH_SIZE = 20
+ERROR_RATE_SLACK = 0.01
+
+
+class Client:
+    """One keep-alive connection; records (label, status, latency) per request."""
+
+    def __init__(self, base_url: str, samples: dict):
+        url = urllib.parse.urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.samples = samples
+        self.token = None
+        self.conn = None
+
+    def request(self, method: str, path: str, body=None, label: str = None, auth: bool = True):
+        headers = {"Accept": "application/json"}
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        if auth and self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        label = label or f"{method} {path.split('?')[0]}"
+
+        start = time.perf_counter()
+        # A kept-alive connection may have been closed by the server (worker
+        # recycled after WEB_MAX_REQUESTS); retry once on a fresh one, as
+        # browsers do.
+        for attempt in (1, 2):
+            reused = self.conn is not None
+            try:
+                if self.conn is None:
+                    self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+                self.conn.request(method, path, body=body, headers=headers)
+                resp = self.conn.getresponse()
+                data = resp.read()
+                status = resp.status
+                break
+            except (OSError, http.client.HTTPException):
+                self.conn.close()
+                self.conn = None
+                data, status = b"", 0
+                if not reused:
+                    break
+        self.samples[label].append(((time.perf_counter() - start) * 1000, status))
+        if status and resp.getheader("Content-Type", "").startswith("application/json"):
+            return status, json.loads(data)
+        return status, None
+
+    def login(self, email: str, password: str, label: str = None) -> None:
+        status, data = self.request(
+            "POST", "/auth/login", {"email": email, "password": password}, label=label, auth=False
+        )
+        if status != 200:
+            raise RuntimeError(f"login as {email} failed with {status}: {data}")
+        self.token = data["access_token"]
+
+
+def login_storm(client: Client, ctx: dict, rng: random.Random) -> None:
+    email = user_email(rng.randrange(ctx["users"]))
+    client.request("POST", "/auth/login", {"email": email, "password": ctx["password"]}, auth=False)
+
+
+def autocomplete(client: Client, ctx: dict, rng: random.Random) -> None:
+    word = rng.choice(SKIN_WORDS)
+    for end in range(2, len(word) + 1):
+        client.request("GET", "/catalog/skins/search?" + urllib.parse.urlencode({"q": word[:end], "limit": 10}))
+
+
+def inventory_reload(client: Client, ctx: dict, rng: random.Random) -> None:
+    client.request("GET", "/inventory", auth=False)
+    client.request("GET", "/skins")
+    client.request("GET", "/catalog/skins?page=1&page_size=8")
+    client.request("GET", "/portfolio/summary")
+
+
+def bulk_edits(client: Client, ctx: dict, rng: random.Random) -> None:
+    creates = [
+        {
+            "op": "create",
+            "catalog_skin_id": rng.choice(ctx["catalog_ids"]),
+            "wear": rng.choice(WEARS),
+            "quantity": rng.randint(1, 3),
+            "buy_price_eur": round(rng.uniform(5, 2500), 2),
+        }
+        for _ in range(BATCH_SIZE)
+    ]
+    status, data = client.request("POST", "/skins/batch", {"operations": creates}, label="POST /skins/batch create")
+    if status != 200:
+        return
+    ids = [item["id"] for item in data["created"]]
+    updates = [{"op": "update", "id": i, "quantity": rng.randint(1, 5)} for i in ids]
+    client.request("POST", "/skins/batch", {"operations": updates}, label="POST /skins/batch update")
+    deletes = [{"op": "delete", "id": i} for i in ids]
+    client.request("POST", "/skins/batch", {"operations": deletes}, label="POST /skins/batch delete")
+
+
+SCENARIOS = {
+    "login_storm": login_storm,
+    "autocomplete": autocomplete,
+    "inventory_reload": inventory_reload,
+    "bulk_edits": bulk_edits,
+}
+AUTHENTICATED = {"autocomplete", "inventory_reload", "bulk_edits"}
+
+
+def _percentile(values: list, pct: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def summarize(samples: dict, elapsed: float) -> dict:
+    report = {}
+    for label, rows in sorted(samples.items()):
+        latencies = [ms for ms, _ in rows]
+        report[label] = {
+            "requests": len(rows),
+            "errors": sum(1 for _, status in rows if not 200 <= status < 400),
+            "rps": round(len(rows) / elapsed, 1),
+            "p50_ms": round(_percentile(latencies, 50), 2),
+            "p95_ms": round(_percentile(latencies, 95), 2),
+            "p99_ms": round(_percentile(latencies, 99), 2),
+            "max_ms": round(max(latencies), 2),
+        }
+    return report
+
+
+def run_scenario(name: str, args, ctx: dict) -> dict:
+    scenario = SCENARIOS[name]
+    per_thread = [defaultdict(list) for _ in range(args.concurrency)]
+    clients = [Client(args.base_url, samples) for samples in per_thread]
+    if name in AUTHENTICATED:
+        for n, client in enumerate(clients):
+            client.login(user_email(n % args.users), args.password, label="setup")
+            client.samples.clear()
+
+    deadline = time.perf_counter() + args.duration
+
+    def worker(n: int) -> None:
+        rng = random.Random(args.seed * 1000 + n)
+        while time.perf_counter() < deadline:
+            scenario(clients[n], ctx, rng)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    merged = defaultdict(list)
+    for samples in per_thread:
+        for label, rows in samples.items():
+            merged[label].extend(rows)
+    return summarize(merged, elapsed)
+
+
+def best_run(name: str, args, ctx: dict) -> dict:
+    runs = [run_scenario(name, args, ctx) for _ in range(args.runs)]
+    return max(runs, key=lambda report: sum(e["requests"] for e in report.values()))
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """Human-readable regressions of `report` against `baseline`."""
+    regressions = []
+    for scenario, endpoints in baseline["scenarios"].items():
+        for label, base in endpoints.items():
+            current = report["scenarios"].get(scenario, {}).get(label)
+            if current is None:
+                continue
+            where = f"{scenario} {label}"
+            if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{where}: p95 {base['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms")
+            if current["rps"] < base["rps"] * (1 - tolerance):
+                regressions.append(f"{where}: rps {base['rps']:.1f} -> {current['rps']:.1f}")
+            base_rate = base["errors"] / base["requests"]
+            rate = current["errors"] / current["requests"]
+            if rate > base_rate + ERROR_RATE_SLACK:
+                regressions.append(f"{where}: error rate {base_rate:.1%} -> {rate:.1%}")
+    return regressions
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(timeout: float = 60) -> tuple:
+    """`python serving.py` on a free local port, against the current DATABASE_URL."""
+    port = _free_port()
+    env = {**os.environ, "WEB_BIND": f"127.0.0.1:{port}"}
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    server = subprocess.Popen(
+        [sys.executable, "serving.py"], cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"serving.py exited with {server.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/ready")
+            if conn.getresponse().status == 200:
+                return server, f"http://127.0.0.1:{port}"
+        except OSError:
+            pass
+        time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("serving.py did not become ready")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--serve", action="store_true", help="start serving.py against DATABASE_URL")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--runs", type=int, default=3, help="runs per scenario; the best is reported")
+    parser.add_argument("--duration", type=float, default=5, help="seconds per run")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--users", type=int, default=200, help="synthetic users to log in as")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--save-baseline", action="store_true", help="write the report to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    baseline_path = args.baseline or DEFAULT_BASELINE
+
+    server = None
+    if args.serve:
+        server, args.base_url = start_server()
+    try:
+        setup = Client(args.base_url, defaultdict(list))
+        setup.login(user_email(0), args.password)
+        _, page = setup.request("GET", "/catalog/skins?page=1&page_size=100")
+        ctx = {
+            "users": args.users,
+            "password": args.password,
+            "catalog_ids": [item["id"] for item in page["items"]],
+        }
+        report = {
+            "meta": {
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "base_url": args.base_url,
+                "runs": args.runs,
+                "duration_s": args.duration,
+                "concurrency": args.concurrency,
+                "users": args.users,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+            },
+            "scenarios": {name: best_run(name, args, ctx) for name in names},
+        }
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=60)
+
+    output = json.dumps(report, indent=2) + "\n"
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        sys.stdout.write(output)
+
+    if args.save_baseline:
+        baseline_path.write_text(output)
+        print(f"baseline written to {baseline_path}", file=sys.stderr)
+    elif args.baseline is not None or baseline_path.exists():
+        regressions = compare(report, json.loads(baseline_path.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {baseline_path} (tolerance {args.tolerance:.0%})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
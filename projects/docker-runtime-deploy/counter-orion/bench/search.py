@@ -0,0 +1,131 @@
+"""Catalog search latency per keystroke against a realistic vocabulary.
+
+Indexes the seed catalog plus `--entries` synthetic rows named from
+`--vocabulary` words generated by a letter-trigram model of the seed skin
+names, so they share the seed's prefixes and near-misses. Then replays what
+autocomplete sends while a word is typed: every prefix of a skin word, with a
+typo (substitution, deletion, insertion or transposition) in half of them,
+some after a weapon name. Each query's best of `--repeat` runs counts, so a
+busy machine does not decide the result.
+
+Exits non-zero when p99 exceeds its budget, so it can gate CI.
+
+Usage:
+    python bench/search.py [--entries 2500] [--vocabulary 3000] [--words 300] [--budget-ms 1.0]
+"""
+import argparse
+import json
+import random
+import statistics
+import string
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from catalog_search import CatalogEntry, CatalogIndex, normalize
+
+SEED_FILE = ROOT / "data" / "cs2_skins_seed.json"
+
+
+def vocabulary(seed_rows: list, size: int, rng: random.Random) -> list:
+    words = sorted({w for row in seed_rows for w in normalize(row["skin_name"]).split() if w.isalpha()})
+    follow = {}
+    for word in words:
+        padded = f"^^{word}$"
+        for i in range(len(padded) - 2):
+            follow.setdefault(padded[i : i + 2], []).append(padded[i + 2])
+    vocab = set(words)
+    while len(vocab) < size:
+        word = "^^"
+        while not word.endswith("$") and len(word) < 14:
+            word += rng.choice(follow[word[-2:]])
+        word = word[2:].rstrip("$")
+        if len(word) >= 3:
+            vocab.add(word)
+    return sorted(vocab)
+
+
+def catalog(seed_rows: list, vocab: list, count: int, rng: random.Random) -> list:
+    entries = [CatalogEntry(i, row["weapon"], row["skin_name"], row["rarity"]) for i, row in enumerate(seed_rows)]
+    weapons = sorted({row["weapon"] for row in seed_rows})
+    for _ in range(count):
+        name = " ".join(word.capitalize() for word in rng.sample(vocab, rng.choice((1, 2, 2))))
+        entries.append(CatalogEntry(len(entries), rng.choice(weapons), name, "Covert"))
+    return entries
+
+
+def typo(word: str, rng: random.Random) -> str:
+    letters = list(word)
+    i = rng.randrange(len(letters) - 1)
+    kind = rng.choice("sdit")
+    if kind == "s":
+        letters[i] = rng.choice(string.ascii_lowercase)
+    elif kind == "d":
+        del letters[i]
+    elif kind == "i":
+        letters.insert(i, rng.choice(string.ascii_lowercase))
+    else:
+        letters[i], letters[i + 1] = letters[i + 1], letters[i]
+    return "".join(letters)
+
+
+def keystrokes(entries: list, words: int, rng: random.Random) -> list:
+    queries = []
+    for _ in range(words):
+        entry = rng.choice(entries)
+        word = rng.choice(normalize(entry.skin_name).split())
+        if len(word) > 3 and rng.random() < 0.5:
+            word = typo(word, rng)
+        lead = normalize(entry.weapon) + " " if rng.random() < 0.2 else ""
+        queries.extend(lead + word[:n] for n in range(2, len(word) + 1))
+    return queries
+
+
+def measure(index: CatalogIndex, query: str, limit: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        index.search(query, limit)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=2500, help="synthetic rows on top of the seed catalog")
+    parser.add_argument("--vocabulary", type=int, default=3000)
+    parser.add_argument("--words", type=int, default=300, help="words typed, one query per keystroke")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--budget-ms", type=float, default=1.0, help="p99 per search")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    seed_rows = json.loads(SEED_FILE.read_text())
+    entries = catalog(seed_rows, vocabulary(seed_rows, args.vocabulary, rng), args.entries, rng)
+    start = time.perf_counter()
+    index = CatalogIndex(entries)
+    build_ms = (time.perf_counter() - start) * 1000
+    queries = keystrokes(entries, args.words, rng)
+    timings = sorted(((measure(index, q, args.limit, args.repeat), q) for q in queries), reverse=True)
+    ms = sorted(t for t, _ in timings)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+
+    print(f"index: {len(entries)} entries built in {build_ms:.0f} ms")
+    print(f"search: {len(ms)} queries  p50 {statistics.median(ms):.3f} ms  p99 {p99:.3f} ms  max {ms[-1]:.3f} ms")
+    for t, q in timings[: args.top]:
+        print(f"  {q!r:32} {t:8.3f} ms")
+    print(f"budget: p99 {args.budget_ms:.3f} ms")
+    if p99 > args.budget_ms:
+        print(f"SEARCH BUDGET EXCEEDED: p99 {p99:.3f} ms > {args.budget_ms:.3f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
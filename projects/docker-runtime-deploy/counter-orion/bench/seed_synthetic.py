@@ -0,0 +1,137 @@
+"""Seed synthetic users, catalog rows and inventories for load testing.
+
+Works against whatever DATABASE_URL points at (SQLite file or Postgres) once
+the schema is migrated. Synthetic rows are tagged (users by email domain,
+catalog rows by collection) so `--reset` removes exactly what an earlier run
+added. Use a dedicated database: scripts/seed_catalog.py deletes catalog rows
+missing from the seed file, which fails while inventories reference them.
+
+Every synthetic user logs in with the same password (`--password`), so the
+hash is computed once. Names and catalog rows come from synthetic_data.py.
+
+Usage:
+    DATABASE_URL=sqlite:////tmp/bench.db flask --app manage.py db upgrade
+    DATABASE_URL=sqlite:////tmp/bench.db python bench/seed_synthetic.py \\
+        [--users 200] [--catalog 2000] [--items-per-user 50] [--reset]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import delete, insert, or_, select
+
+from app import (
+    CatalogState,
+    SkinCatalog,
+    User,
+    UserSkin,
+    create_app,
+    db,
+    password_hasher,
+    rebuild_portfolio_summaries,
+)
+from synthetic_data import COLLECTION, DEFAULT_PASSWORD, EMAIL_DOMAIN, WEARS, catalog_rows, user_email
+
+BATCH_SIZE = 5000
+
+
+def _insert_batches(table, rows) -> int:
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            db.session.execute(insert(table), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(table), batch)
+        total += len(batch)
+    return total
+
+
+def reset() -> None:
+    users = select(User.id).where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+    catalog = select(SkinCatalog.id).where(SkinCatalog.collection == COLLECTION)
+    db.session.execute(
+        delete(UserSkin).where(or_(UserSkin.user_id.in_(users), UserSkin.catalog_skin_id.in_(catalog)))
+    )
+    db.session.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+    db.session.execute(delete(SkinCatalog).where(SkinCatalog.collection == COLLECTION))
+    db.session.commit()
+
+
+def seed(users: int, catalog: int, items_per_user: int, password: str, rng: random.Random) -> dict:
+    _insert_batches(SkinCatalog.__table__, catalog_rows(catalog))
+    catalog_ids = list(db.session.scalars(select(SkinCatalog.id).where(SkinCatalog.collection == COLLECTION)))
+
+    password_hash = password_hasher.hash(password)
+    _insert_batches(
+        User.__table__,
+        ({"email": user_email(n), "username": f"load{n:06d}", "password_hash": password_hash} for n in range(users)),
+    )
+    user_ids = list(db.session.scalars(select(User.id).where(User.email.like(f"%@{EMAIL_DOMAIN}"))))
+
+    items = _insert_batches(
+        UserSkin.__table__,
+        (
+            {
+                "user_id": user_id,
+                "catalog_skin_id": rng.choice(catalog_ids),
+                "wear": rng.choice(WEARS),
+                "stattrak": rng.random() < 0.2,
+                "quantity": rng.randint(1, 3),
+                "note": None,
+                "buy_price_eur": round(rng.uniform(5, 2500), 2),
+            }
+            for user_id in user_ids
+            for _ in range(items_per_user)
+        ),
+    )
+
+    # Workers reload their catalog search index when the version moves.
+    state = db.session.get(CatalogState, 1)
+    if state is None:
+        db.session.add(
+            CatalogState(id=1, seed_hash="synthetic", applied_at=datetime.now(timezone.utc), catalog_version=1)
+        )
+    else:
+        state.catalog_version = CatalogState.catalog_version + 1
+    db.session.commit()
+    summary_rows = rebuild_portfolio_summaries()
+    return {"users": len(user_ids), "catalog": len(catalog_ids), "items": items, "summary_rows": summary_rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--catalog", type=int, default=2000)
+    parser.add_argument("--items-per-user", type=int, default=50)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, default=1, help="random seed for inventories")
+    parser.add_argument("--reset", action="store_true", help="remove rows from an earlier run first")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        existing = db.session.scalar(select(User.id).where(User.email.like(f"%@{EMAIL_DOMAIN}")).limit(1))
+        if existing is not None and not args.reset:
+            sys.exit("synthetic data already present; pass --reset to replace it")
+        start = time.perf_counter()
+        if args.reset:
+            reset()
+        counts = seed(args.users, args.catalog, args.items_per_user, args.password, random.Random(args.seed))
+
+    elapsed = time.perf_counter() - start
+    print(", ".join(f"{name}={value}" for name, value in counts.items()) + f" in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Micro-benchmark: ORM objects + stdlib jsonify vs. row tuples + FastJSONProvider.
+
+Builds an in-memory SQLite catalog and inventory, then times the query and
+serialization work behind a `/catalog/skins` page and a full `/skins` list,
+and checks that both paths produce identical bytes.
+
+Usage:
+    python bench/serialization.py [--rows 5000] [--page-size 100] [--iterations 50]
+"""
+import argparse
+import os
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ["DATABASE_URL"] = "sqlite://"
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import (
+    SkinCatalog,
+    User,
+    UserSkin,
+    _catalog_to_dict,
+    _user_skin_rows,
+    _user_skin_to_dict,
+    create_app,
+    db,
+)
+
+
+def _populate(rows: int) -> None:
+    db.create_all()
+    user = User(email="bench@orion.local", username="bench", password_hash="x")
+    db.session.add(user)
+    db.session.add_all(
+        SkinCatalog(weapon=f"Weapon {i % 40:02d}", skin_name=f"Skin {i:05d}", rarity="Covert") for i in range(rows)
+    )
+    db.session.flush()
+    db.session.add_all(
+        UserSkin(user_id=user.id, catalog_skin_id=i + 1, wear="Field-Tested", quantity=1 + i % 3, buy_price_eur=12.5)
+        for i in range(rows)
+    )
+    db.session.commit()
+
+
+def _time(fn, iterations: int) -> float:
+    return timeit.timeit(fn, number=iterations) / iterations * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app()
+    stdlib = DefaultJSONProvider(app)
+    order = (SkinCatalog.weapon.asc(), SkinCatalog.skin_name.asc(), SkinCatalog.id.asc())
+    columns = (SkinCatalog.id, SkinCatalog.weapon, SkinCatalog.skin_name, SkinCatalog.rarity)
+
+    with app.test_request_context():
+        _populate(args.rows)
+
+        def catalog_before():
+            items = SkinCatalog.query.order_by(*order).limit(args.page_size).all()
+            return stdlib.response({"items": [_catalog_to_dict(i) for i in items]}).get_data()
+
+        def catalog_after():
+            items = db.session.query(*columns).order_by(*order).limit(args.page_size).all()
+            return app.json.response({"items": [_catalog_to_dict(i) for i in items]}).get_data()
+
+        inventory = [_user_skin_to_dict(row) for row in _user_skin_rows().all()]
+
+        def inventory_before():
+            return stdlib.response({"items": inventory, "total": len(inventory)}).get_data()
+
+        def inventory_after():
+            return app.json.response({"items": inventory, "total": len(inventory)}).get_data()
+
+        assert catalog_before() == catalog_after(), "catalog output differs"
+        assert inventory_before() == inventory_after(), "inventory output differs"
+
+        for name, before, after in (
+            (f"catalog page ({args.page_size} rows)", catalog_before, catalog_after),
+            (f"inventory encode ({args.rows} rows)", inventory_before, inventory_after),
+        ):
+            slow = _time(before, args.iterations)
+            fast = _time(after, args.iterations)
+            print(f"{name:32} before {slow:8.3f} ms   after {fast:8.3f} ms   speedup {slow / fast:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Names and rows for the synthetic load-test dataset.
+
+Pure data generation with no app or database imports: bench/seed_synthetic.py
+writes these rows, and bench/load.py, an HTTP-only client, uses the same
+names to log in and search.
+"""
+EMAIL_DOMAIN = "load.orion.local"
+COLLECTION = "bench-synthetic"
+DEFAULT_PASSWORD = "bench-password"
+
+WEAPONS = (
+    "AK-47", "AUG", "AWP", "CZ75-Auto", "Desert Eagle", "Dual Berettas", "FAMAS", "Five-SeveN",
+    "G3SG1", "Galil AR", "Glock-18", "M249", "M4A1-S", "M4A4", "MAC-10", "MAG-7", "MP5-SD", "MP7",
+    "MP9", "Negev", "Nova", "P2000", "P250", "P90", "PP-Bizon", "R8 Revolver", "SCAR-20", "SG 553",
+    "SSG 08", "Sawed-Off", "Tec-9", "UMP-45", "USP-S", "XM1014", "Karambit", "Butterfly Knife",
+)
+ADJECTIVES = (
+    "Asiimov", "Bloodsport", "Crimson", "Cyber", "Dragon", "Emerald", "Fade", "Fever", "Fire",
+    "Gamma", "Golden", "Howling", "Hyper", "Ice", "Neon", "Nightmare", "Orbit", "Printstream",
+    "Redline", "Royal", "Safari", "Slate", "Tiger", "Vulcan",
+)
+NOUNS = (
+    "Beast", "Blaze", "Circuit", "Dawn", "Dream", "Empress", "Fang", "Ghost", "Hunter", "Legion",
+    "Lore", "Monster", "Phoenix", "Queen", "Rider", "Serpent", "Storm", "Tide", "Viper", "Wave",
+)
+# bench/load.py types prefixes of these in its autocomplete scenario.
+SKIN_WORDS = ADJECTIVES + NOUNS
+RARITIES = ("Covert", "Extraordinary")
+WEARS = ("Factory New", "Minimal Wear", "Field-Tested", "Well-Worn", "Battle-Scarred", None)
+
+
+def user_email(n: int) -> str:
+    return f"load{n:06d}@{EMAIL_DOMAIN}"
+
+
+def catalog_rows(count: int):
+    combos = len(ADJECTIVES) * len(NOUNS)
+    for i in range(count):
+        weapon = WEAPONS[i % len(WEAPONS)]
+        generation, combo = divmod(i // len(WEAPONS), combos)
+        adjective, noun = ADJECTIVES[combo // len(NOUNS)], NOUNS[combo % len(NOUNS)]
+        name = f"{adjective} {noun}" + (f" Mk {generation + 1}" if generation else "")
+        yield {
+            "game": "cs2",
+            "weapon": weapon,
+            "skin_name": name,
+            "rarity": RARITIES[i % 7 == 0],
+            "collection": COLLECTION,
+        }
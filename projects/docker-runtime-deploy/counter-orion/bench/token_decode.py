@@ -0,0 +1,40 @@
+"""Micro-benchmark: full JWT verification vs. the verified-token cache.
+
+Usage:
+    python bench/token_decode.py [--iterations 20000]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import jwt
+
+from app import JWT_SECRET, CurrentUser, _create_token, _decode_token, token_cache
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = _create_token(CurrentUser(1, "bench@orion.local", "bench", None), "access")
+
+    uncached = timeit.timeit(lambda: jwt.decode(token, JWT_SECRET, algorithms=["HS256"]), number=args.iterations)
+    token_cache.clear()
+    _decode_token(token, "access")
+    cached = timeit.timeit(lambda: _decode_token(token, "access"), number=args.iterations)
+
+    per_uncached = uncached / args.iterations * 1e6
+    per_cached = cached / args.iterations * 1e6
+    print(f"jwt.decode:      {per_uncached:8.2f} us/op")
+    print(f"cached decode:   {per_cached:8.2f} us/op")
+    print(f"speedup:         {per_uncached / per_cached:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""In-process search index for the skins catalog.
+
+`/catalog/skins/search` is called on every keystroke of the inventory
+autocomplete. A leading-wildcard ILIKE cannot use the catalog B-tree indexes,
+so each worker keeps an n-gram index of the catalog in memory instead and
+answers autocomplete without a database round-trip.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from worker_thread import WorkerThread
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    id: int
+    weapon: str
+    skin_name: str
+    rarity: str
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().replace("|", " ").split())
+
+
+def _grams(text: str, n: int) -> set:
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+def _max_typos(token: str) -> int:
+    # Edits tolerated per query word: none for 1-2 letters, one up to five,
+    # two beyond that.
+    if len(token) < 3:
+        return 0
+    return 1 if len(token) < 6 else 2
+
+
+# Shortest delete key worth storing per delete depth: a query word allowed
+# one typo has at least 3 letters and one allowed two at least 6, so its own
+# deletes never get shorter than 2 or 4 letters. Undeleted keys go down to
+# one letter for the start of a word still being typed.
+_MIN_KEY_LENGTH = (1, 2, 4)
+
+
+def _prefix_deletes(word: str, depth: int) -> list:
+    """Delete keys of every prefix of `word`, indexed by prefix length.
+
+    Entry n holds `word[:n]` and every string reachable from it by deleting up
+    to `depth` letters. Two words within `depth` edits (a transposition
+    included) always share one of these keys, which is what the fuzzy tier
+    looks candidates up by. Built incrementally: deleting exactly d letters
+    from `p + c` either keeps `c` or spends a delete on it.
+    """
+    exact = [{""}] + [set() for _ in range(depth)]
+    keys = [_keep_long(exact)]
+    for c in word:
+        exact = [{s + c for s in exact[0]}] + [
+            {s + c for s in exact[d]} | exact[d - 1] for d in range(1, depth + 1)
+        ]
+        keys.append(_keep_long(exact))
+    return keys
+
+
+def _keep_long(exact: list) -> set:
+    return {s for d, level in enumerate(exact) for s in level if len(s) >= _MIN_KEY_LENGTH[d]}
+
+
+def _deletes(word: str, depth: int) -> set:
+    """`_prefix_deletes(word, depth)[-1]` without the shorter prefixes."""
+    keys = set()
+    level = {word}
+    for d in range(depth + 1):
+        level = {w for w in level if len(w) >= _MIN_KEY_LENGTH[d]}
+        keys |= level
+        if d < depth:
+            level = {w[:i] + w[i + 1 :] for w in level for i in range(len(w))}
+    return keys
+
+
+def _letter_masks(token: str) -> dict:
+    """Letter -> bit mask of its positions in `token`, for `_prefix_distances`."""
+    masks = {}
+    for i, c in enumerate(token):
+        masks[c] = masks.get(c, 0) | 1 << i
+    return masks
+
+
+def _prefix_distances(token: str, masks: dict, b: str) -> list:
+    """Optimal string alignment distances (a transposition counts as one edit)
+    from `token` to every prefix of `b`, indexed by prefix length.
+
+    Hyyro's bit-parallel form of the edit-distance table: each letter of `b`
+    advances a whole column as a few integer operations on bit vectors over
+    `token`, whose letter positions are `masks`.
+    """
+    last = 1 << (len(token) - 1)
+    vp, vn, d0, prev_match = (1 << len(token)) - 1, 0, 0, 0
+    distance = len(token)
+    row = [distance]
+    for c in b:
+        match = masks.get(c, 0)
+        transposed = ((~d0 & match) << 1) & prev_match
+        d0 = (((match & vp) + vp) ^ vp) | match | vn | transposed
+        hp = vn | ~(d0 | vp)
+        hn = d0 & vp
+        if hp & last:
+            distance += 1
+        elif hn & last:
+            distance -= 1
+        hp = (hp << 1) | 1
+        vp = (hn << 1) | ~(d0 | hp)
+        vn = hp & d0
+        prev_match = match
+        row.append(distance)
+    return row
+
+
+def _partial_cost(token: str, masks: dict, head: str, limit: int, whole: bool) -> int:
+    """Fuzzy cost of `token` against the start of a word (all of it when `whole`)."""
+    row = _prefix_distances(token, masks, head)
+    cost = 2 * min(row[max(1, len(token) - limit) :]) + 1
+    return min(cost, 2 * row[-1]) if whole else cost
+
+
+def _prefix_range(sorted_keys: list, q: str):
+    """Yield positions whose key starts with `q` from a sorted (key, pos) list."""
+    i = bisect_left(sorted_keys, (q,))
+    while i < len(sorted_keys) and sorted_keys[i][0].startswith(q):
+        yield sorted_keys[i][1]
+        i += 1
+
+
+class CatalogIndex:
+    """Immutable n-gram index over one snapshot of the catalog.
+
+    Results are ranked in tiers: skin or weapon name starts with the query,
+    then any word starts with it, then plain substring matches. Only when
+    none of those match, fuzzy matches where every query word is within a few
+    edits of a word in the name (the last one may still be half typed). Ties
+    keep catalog order (weapon, skin_name).
+    """
+
+    def __init__(self, entries):
+        self.entries = tuple(sorted(entries, key=lambda e: (e.weapon, e.skin_name, e.id)))
+        weapons = [normalize(e.weapon) for e in self.entries]
+        skins = [normalize(e.skin_name) for e in self.entries]
+        self._haystacks = [f"{w} {s}" for w, s in zip(weapons, skins)]
+
+        self._name_keys = sorted([(w, pos) for pos, w in enumerate(weapons)] + [(s, pos) for pos, s in enumerate(skins)])
+        word_keys = []
+        for pos, text in enumerate(self._haystacks):
+            for i in range(len(text)):
+                if i == 0 or text[i - 1] == " ":
+                    word_keys.append((text[i:], pos))
+        self._word_keys = sorted(word_keys)
+
+        # Bigrams serve 2-char queries, trigrams everything longer.
+        self._postings = {}
+        self._word_postings = {}
+        for pos, text in enumerate(self._haystacks):
+            for gram in _grams(text, 2) | _grams(text, 3):
+                self._postings.setdefault(gram, []).append(pos)
+            for word in set(text.split()):
+                self._word_postings.setdefault(word, []).append(pos)
+
+        # Symmetric-delete keys for the fuzzy tier, so a typo only costs edit
+        # distances against words sharing a key with it rather than against
+        # the whole vocabulary. Proper prefixes are keyed separately for the
+        # word still being typed.
+        word_deletes = {}
+        prefix_deletes = {}
+        for word in self._word_postings:
+            *prefixes, whole = _prefix_deletes(word, 2)
+            for key in whole:
+                word_deletes.setdefault(key, []).append(word)
+            for key in set().union(*prefixes):
+                prefix_deletes.setdefault(key, []).append(word)
+        # Most keys name a single word; tuples drop the lists' spare capacity.
+        self._word_deletes = {key: tuple(words) for key, words in word_deletes.items()}
+        self._prefix_deletes = {key: tuple(words) for key, words in prefix_deletes.items()}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _substring_matches(self, q: str) -> set:
+        grams = _grams(q, 3) if len(q) >= 3 else {q}
+        postings = []
+        for gram in grams:
+            hit = self._postings.get(gram)
+            if not hit:
+                return set()
+            postings.append(hit)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for hit in postings[1:]:
+            candidates.intersection_update(hit)
+            if not candidates:
+                return candidates
+        if len(q) <= 3:
+            return candidates
+        return {pos for pos in candidates if q in self._haystacks[pos]}
+
+    def _word_distances(self, token: str, partial: bool, limit: int, within=None) -> dict:
+        """Position -> cost of the closest word within `limit` edits in that entry.
+
+        Cost is twice the edit count, plus one when only a prefix of the word
+        matched, so a whole-word match wins a tie. With `within`, only words
+        occurring at those positions are considered.
+        """
+        keys = _deletes(token, limit)
+        words = {word for key in keys for word in self._word_deletes.get(key, ())}
+        if partial:
+            words.update(word for key in keys for word in self._prefix_deletes.get(key, ()))
+        if within is not None:
+            words = {word for word in words if not within.isdisjoint(self._word_postings[word])}
+        masks = _letter_masks(token)
+        best = {}
+        # Words longer than token + limit can only match by prefix, so their
+        # cost depends on the first len(token) + limit letters alone.
+        head_costs = {}
+        for word in words:
+            if partial and len(word) > len(token):
+                # The word being typed: compare against prefixes of about its
+                # length, and the whole word when it is that short.
+                head = word[: len(token) + limit]
+                if head == word:
+                    cost = _partial_cost(token, masks, word, limit, whole=True)
+                else:
+                    cost = head_costs.get(head)
+                    if cost is None:
+                        cost = head_costs[head] = _partial_cost(token, masks, head, limit, whole=False)
+            elif abs(len(word) - len(token)) <= limit:
+                cost = 2 * _prefix_distances(token, masks, word)[-1]
+            else:
+                continue
+            if cost > 2 * limit + 1:
+                continue
+            for pos in self._word_postings[word]:
+                if cost < best.get(pos, cost + 1):
+                    best[pos] = cost
+        return best
+
+    def _fuzzy_ranked(self, tokens: list, typos: list, limit: int) -> list:
+        scores = None
+        for i, (token, max_typos) in enumerate(zip(tokens, typos)):
+            distances = self._word_distances(token, i == len(tokens) - 1, max_typos, scores.keys() if scores is not None else None)
+            if scores is None:
+                scores = distances
+            else:
+                scores = {pos: score + distances[pos] for pos, score in scores.items() if pos in distances}
+            if not scores:
+                return []
+        return heapq.nsmallest(limit, ((score, pos) for pos, score in scores.items()))
+
+    def _fuzzy_matches(self, q: str, limit: int) -> list:
+        tokens = q.split()
+        typos = [_max_typos(token) for token in tokens]
+        if not any(typos):
+            return []
+        if max(typos) > 1:
+            # One typo per word first. Two typos in any word cost at least 4,
+            # so when that pass fills `limit` with cheaper results the wider
+            # pass could not change them, and it has far more candidates.
+            ranked = self._fuzzy_ranked(tokens, [min(n, 1) for n in typos], limit)
+            if len(ranked) == limit and ranked[-1][0] < 4:
+                return [pos for _, pos in ranked]
+        return [pos for _, pos in self._fuzzy_ranked(tokens, typos, limit)]
+
+    def search(self, query: str, limit: int) -> list:
+        q = normalize(query)
+        if len(q) < 2:
+            return []
+
+        seen = set()
+        ranked = []
+        for tier in (_prefix_range(self._name_keys, q), _prefix_range(self._word_keys, q)):
+            found = set(tier) - seen
+            seen |= found
+            ranked.extend(heapq.nsmallest(limit - len(ranked), found))
+            if len(ranked) >= limit:
+                return [self.entries[pos] for pos in ranked]
+
+        ranked.extend(heapq.nsmallest(limit - len(ranked), self._substring_matches(q) - seen))
+
+        # Typo tolerance only kicks in when exact matching found nothing.
+        if not ranked:
+            ranked = self._fuzzy_matches(q, limit)
+        return [self.entries[pos] for pos in ranked]
+
+
+class CatalogSearch:
+    """Per-worker holder that loads the index and keeps it fresh.
+
+    The index is built and refreshed on a background thread started once per
+    process (`ensure_started`, from gunicorn's post_fork or the first
+    request), never on a request thread; a search that arrives before the
+    first build waits for it. The catalog version (bumped by the seeder) is
+    polled every `refresh_interval` seconds and the index is only reloaded
+    when it moved; searches keep using the previous snapshot meanwhile.
+    Failed loads are retried with exponential backoff up to
+    `max_retry_interval`. `version` is the catalog version of the current
+    index, so other per-worker catalog caches can key on it.
+    """
+
+    def __init__(
+        self,
+        load_entries,
+        load_version,
+        refresh_interval: float = 10.0,
+        max_retry_interval: float = 60.0,
+        load_timeout: float = 10.0,
+    ):
+        self._load_entries = load_entries
+        self._load_version = load_version
+        self.refresh_interval = refresh_interval
+        self.max_retry_interval = max_retry_interval
+        self.load_timeout = load_timeout
+        self._index = None
+        self.version = None
+        self.last_error = None
+        self._attempted = threading.Event()
+        self._thread = WorkerThread(self._loop, "catalog-index", reset=self._forget_attempts)
+
+    @property
+    def loaded(self) -> bool:
+        return self._index is not None
+
+    def refresh(self) -> None:
+        # Version first: entries read afterwards are at least that new, and a
+        # seed landing in between just triggers one more reload next time.
+        version = self._load_version()
+        if self._index is None or version != self.version:
+            self._index = CatalogIndex(list(self._load_entries()))
+            self.version = version
+
+    def ensure_started(self) -> None:
+        self._thread.ensure_started()
+
+    def _forget_attempts(self) -> None:
+        self._attempted = threading.Event()
+
+    def _loop(self) -> None:
+        failures = 0
+        while True:
+            try:
+                self.refresh()
+                failures = 0
+                self.last_error = None
+            except Exception as exc:
+                failures += 1
+                self.last_error = f"{type(exc).__name__}: {exc}"
+            self._attempted.set()
+            if failures:
+                time.sleep(min(self.max_retry_interval, 2 ** (failures - 1)))
+            else:
+                time.sleep(self.refresh_interval)
+
+    def index(self) -> CatalogIndex:
+        index = self._index
+        if index is None:
+            self.ensure_started()
+            self._attempted.wait(self.load_timeout)
+            index = self._index
+            if index is None:
+                raise RuntimeError(f"catalog index not loaded: {self.last_error or 'still loading'}")
+        return index
+
+    def current_version(self) -> int:
+        self.index()
+        return self.version
+
+    def search(self, query: str, limit: int) -> list:
+        return self.index().search(query, limit)
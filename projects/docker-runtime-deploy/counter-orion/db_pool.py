@@ -0,0 +1,115 @@
+"""SQLAlchemy engine/pool configuration and pool statistics.
+
+Pool sizing comes from DB_POOL_* env vars so it can be matched against
+Postgres `max_connections` (workers x (size + overflow) must fit). The
+default SQLite database gets WAL and relaxed fsync instead.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").strip().lower() not in ("0", "false", "no", "off")
+
+
+class PoolStats:
+    """Live counters for one worker's connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_time_total += seconds
+            self.wait_time_max = max(self.wait_time_max, seconds)
+
+    def snapshot(self, pool) -> dict:
+        data = {
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.timeouts,
+            "wait_time_total_ms": round(self.wait_time_total * 1000, 3),
+            "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+        }
+        if isinstance(pool, QueuePool):
+            data.update(
+                {
+                    "size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "checked_in": pool.checkedin(),
+                    "overflow": max(0, pool.overflow()),
+                    "max_overflow": pool._max_overflow,
+                }
+            )
+        return data
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            pool_stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record_wait(time.perf_counter() - start)
+        return conn
+
+
+def database_url() -> str:
+    """DATABASE_URL with the driver spelled out for plain postgresql:// URLs."""
+    url = os.getenv("DATABASE_URL", "sqlite:////tmp/counter_orion.db")
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+psycopg2://", 1)
+    return url
+
+
+def engine_options(database_url: str) -> dict:
+    if database_url in ("sqlite://", "sqlite:///:memory:"):
+        # In-memory SQLite needs SQLAlchemy's single-connection pool.
+        return {}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "5")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+def sqlite_database_url(database_url: str) -> str:
+    """Opt into SQLite shared cache with SQLITE_SHARED_CACHE=1."""
+    if not database_url.startswith("sqlite") or not _env_bool("SQLITE_SHARED_CACHE", False):
+        return database_url
+    path = database_url.split("///", 1)[1]
+    return f"sqlite:///file:{path}?cache=shared&uri=true"
+
+
+def install_sqlite_pragmas(engine) -> None:
+    journal_mode = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    synchronous = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
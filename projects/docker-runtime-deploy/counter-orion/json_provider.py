@@ -0,0 +1,73 @@
+"""JSON responses encoded with orjson when it is installed.
+
+`jsonify` output stays byte-for-byte what Flask's default provider produces
+(sorted keys, compact separators, ASCII-only, trailing newline). orjson is
+only trusted where its output provably matches:
+- values orjson would render differently (datetime, date, dataclasses,
+  Decimal) are routed through Flask's own `default` hook;
+- anything orjson rejects (ints beyond 64 bits, non-string keys, deep
+  nesting) and any output containing non-ASCII bytes, DEL, or floats that
+  Python prints in exponent form are re-encoded with the stdlib encoder.
+Non-finite floats are the one known difference (orjson writes null, the
+stdlib NaN/Infinity); the API validates them away before they are stored.
+
+Pretty-printed debug output and `current_app.json.dumps` (used for NDJSON
+lines) always take the stdlib path.
+"""
+import re
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Float spellings where orjson and Python's repr disagree: exponents ("1e16"
+# vs "1e+16") and small numbers orjson writes positionally ("0.00001" vs
+# "1e-05"). Two literal-led patterns rather than one alternation, which would
+# defeat the regex engine's prefix scan on large bodies.
+_EXPONENT = re.compile(rb"e(?<=\de)[-\d]")
+_SMALL_FLOAT = re.compile(rb"0\.0000(?<![\d.]0\.0000)")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = (
+        orjson.OPT_SORT_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_APPEND_NEWLINE
+    )
+
+
+def _stdlib_would_differ(body: bytes) -> bool:
+    # ensure_ascii escapes non-ASCII and DEL; orjson writes them raw.
+    return (
+        not body.isascii()
+        or b"\x7f" in body
+        or _EXPONENT.search(body) is not None
+        or _SMALL_FLOAT.search(body) is not None
+    )
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    def _fast_response_body(self, obj):
+        if orjson is None or not self.sort_keys or not self.ensure_ascii:
+            return None
+        try:
+            body = orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError):
+            return None
+        if _stdlib_would_differ(body):
+            return None
+        return body
+
+    def response(self, *args, **kwargs):
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        # Mixing args and kwargs falls through so Flask raises its TypeError.
+        if not pretty and not (args and kwargs):
+            # jsonify(x) -> x, jsonify(a, b) -> [a, b], jsonify(k=v) -> {k: v}, jsonify() -> null.
+            obj = args[0] if len(args) == 1 else (args or kwargs or None)
+            body = self._fast_response_body(obj)
+            if body is not None:
+                return self._app.response_class(body, mimetype=self.mimetype)
+        return super().response(*args, **kwargs)
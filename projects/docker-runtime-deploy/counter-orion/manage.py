@@ -1,9 +1,38 @@
-from app import app, db
+from flask.cli import AppGroup
+
+from app import create_app, init_migrations, rebuild_portfolio_summaries
+
+app = create_app()
+init_migrations(app)
 
 # Flask CLI entrypoint:
 #   flask --app manage.py db init
 #   flask --app manage.py db migrate -m "init users"
 #   flask --app manage.py db upgrade
+#   flask --app manage.py serve   (production server, see serving.py)
+#   flask --app manage.py portfolio rebuild
+
+
+@app.cli.command("serve")
+def serve_command():
+    """Run the app under gunicorn with WEB_* settings from the environment."""
+    from serving import serve
+
+    serve(app)
+
+
+portfolio_cli = AppGroup("portfolio", help="Portfolio summary maintenance.")
+
+
+@portfolio_cli.command("rebuild")
+def portfolio_rebuild_command():
+    """Recompute every user's portfolio summary from user_skins."""
+    rows = rebuild_portfolio_summaries()
+    print(f"Portfolio summary rebuilt: rows={rows}")
+
+
+app.cli.add_command(portfolio_cli)
+
 
 if __name__ == "__main__":
     app.run()
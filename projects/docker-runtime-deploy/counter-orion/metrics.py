@@ -0,0 +1,106 @@
+"""Prometheus request metrics exposed at /metrics.
+
+Under gunicorn every worker writes its samples to mmap-backed files in
+PROMETHEUS_MULTIPROC_DIR and /metrics aggregates all of them, so a scrape
+sees the whole container rather than whichever worker answered. Without that
+variable (dev server) the in-process default registry is used.
+
+Recording is a handful of bucket increments per request; labels are the
+route template, never the raw path, to keep cardinality bounded.
+"""
+import os
+import time
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from sql_tracing import request_db_time
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000, 5000000)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route, method and status",
+    ["route", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+    ["route"],
+    multiprocess_mode="livesum",
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size by route (streamed bodies are not counted)",
+    ["route", "method"],
+    buckets=SIZE_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request",
+    ["route", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def _route() -> str:
+    return request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+
+
+def _before_request():
+    route = _route()
+    g.metrics_route = route
+    g.metrics_start = time.perf_counter()
+    REQUESTS_IN_FLIGHT.labels(route).inc()
+
+
+def _after_request(response):
+    _observe(response.status_code, response.calculate_content_length())
+    return response
+
+
+def _teardown_request(exc):
+    route = g.pop("metrics_route", None)
+    if route is None:
+        return
+    if "metrics_start" in g:
+        # after_request never ran: the view raised.
+        _observe(500, None)
+    REQUESTS_IN_FLIGHT.labels(route).dec()
+
+
+def _observe(status: int, size) -> None:
+    start = g.pop("metrics_start", None)
+    if start is None:
+        return
+    route, method = g.metrics_route, request.method
+    REQUEST_LATENCY.labels(route, method, str(status)).observe(time.perf_counter() - start)
+    REQUEST_DB_TIME.labels(route, method).observe(request_db_time())
+    if size is not None:
+        RESPONSE_SIZE.labels(route, method).observe(size)
+
+
+def metrics_response() -> Response:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def init_app(app) -> None:
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule("/metrics", "metrics", metrics_response)
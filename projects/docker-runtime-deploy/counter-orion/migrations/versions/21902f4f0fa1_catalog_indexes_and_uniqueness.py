@@ -19,15 +19,17 @@ def upgrade():
     op.create_index("ix_skins_catalog_weapon", "skins_catalog", ["weapon"], unique=False)
     op.create_index("ix_skins_catalog_rarity", "skins_catalog", ["rarity"], unique=False)
     op.create_index("ix_skins_catalog_skin_name", "skins_catalog", ["skin_name"], unique=False)
-    op.create_unique_constraint(
-        "uq_skins_catalog_game_weapon_skin",
-        "skins_catalog",
-        ["game", "weapon", "skin_name"],
-    )
+    # batch mode keeps this runnable on SQLite, which cannot ALTER constraints
+    with op.batch_alter_table("skins_catalog", schema=None) as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_skins_catalog_game_weapon_skin",
+            ["game", "weapon", "skin_name"],
+        )
 
 
 def downgrade():
-    op.drop_constraint("uq_skins_catalog_game_weapon_skin", "skins_catalog", type_="unique")
+    with op.batch_alter_table("skins_catalog", schema=None) as batch_op:
+        batch_op.drop_constraint("uq_skins_catalog_game_weapon_skin", type_="unique")
     op.drop_index("ix_skins_catalog_skin_name", table_name="skins_catalog")
     op.drop_index("ix_skins_catalog_rarity", table_name="skins_catalog")
     op.drop_index("ix_skins_catalog_weapon", table_name="skins_catalog")
@@ -0,0 +1,75 @@
+"""catalog text search indexes
+
+Revision ID: 5d8a3f60c2b4
+Revises: 21902f4f0fa1
+Create Date: 2026-10-18 11:20:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "5d8a3f60c2b4"
+down_revision = "21902f4f0fa1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        # pg_trgm GIN indexes serve ILIKE '%q%' directly.
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_skins_catalog_skin_name_trgm",
+            "skins_catalog",
+            ["skin_name"],
+            postgresql_using="gin",
+            postgresql_ops={"skin_name": "gin_trgm_ops"},
+        )
+        op.create_index(
+            "ix_skins_catalog_weapon_trgm",
+            "skins_catalog",
+            ["weapon"],
+            postgresql_using="gin",
+            postgresql_ops={"weapon": "gin_trgm_ops"},
+        )
+    elif dialect == "sqlite":
+        # External-content FTS5 table kept in sync with skins_catalog by triggers.
+        op.execute(
+            "CREATE VIRTUAL TABLE skins_catalog_fts USING fts5("
+            "weapon, skin_name, content='skins_catalog', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(
+            "CREATE TRIGGER skins_catalog_fts_ai AFTER INSERT ON skins_catalog BEGIN "
+            "INSERT INTO skins_catalog_fts(rowid, weapon, skin_name) VALUES (new.id, new.weapon, new.skin_name); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER skins_catalog_fts_ad AFTER DELETE ON skins_catalog BEGIN "
+            "INSERT INTO skins_catalog_fts(skins_catalog_fts, rowid, weapon, skin_name) "
+            "VALUES ('delete', old.id, old.weapon, old.skin_name); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER skins_catalog_fts_au AFTER UPDATE ON skins_catalog BEGIN "
+            "INSERT INTO skins_catalog_fts(skins_catalog_fts, rowid, weapon, skin_name) "
+            "VALUES ('delete', old.id, old.weapon, old.skin_name); "
+            "INSERT INTO skins_catalog_fts(rowid, weapon, skin_name) VALUES (new.id, new.weapon, new.skin_name); "
+            "END"
+        )
+        op.execute("INSERT INTO skins_catalog_fts(skins_catalog_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        op.drop_index("ix_skins_catalog_weapon_trgm", table_name="skins_catalog")
+        op.drop_index("ix_skins_catalog_skin_name_trgm", table_name="skins_catalog")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS skins_catalog_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS skins_catalog_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS skins_catalog_fts_ai")
+        op.execute("DROP TABLE IF EXISTS skins_catalog_fts")
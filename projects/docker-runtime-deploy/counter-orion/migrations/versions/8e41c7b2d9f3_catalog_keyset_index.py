@@ -0,0 +1,29 @@
+"""catalog keyset pagination index
+
+Revision ID: 8e41c7b2d9f3
+Revises: 5d8a3f60c2b4
+Create Date: 2026-10-18 11:45:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "8e41c7b2d9f3"
+down_revision = "5d8a3f60c2b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Matches the (weapon, skin_name, id) ordering and seek predicate of GET /catalog/skins.
+    op.create_index(
+        "ix_skins_catalog_weapon_skin_name_id",
+        "skins_catalog",
+        ["weapon", "skin_name", "id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_skins_catalog_weapon_skin_name_id", table_name="skins_catalog")
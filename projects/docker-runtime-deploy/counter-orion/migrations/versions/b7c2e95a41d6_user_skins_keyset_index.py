@@ -0,0 +1,29 @@
+"""user skins keyset pagination index
+
+Revision ID: b7c2e95a41d6
+Revises: 8e41c7b2d9f3
+Create Date: 2026-10-18 12:30:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b7c2e95a41d6"
+down_revision = "8e41c7b2d9f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves GET /skins ordering and cursor seek: user_id = ? ORDER BY created_at DESC, id DESC.
+    op.create_index(
+        "ix_user_skins_user_id_created_at_id",
+        "user_skins",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_user_skins_user_id_created_at_id", table_name="user_skins")
@@ -0,0 +1,31 @@
+"""catalog seed state
+
+Revision ID: c3f9a1d4e7b2
+Revises: b7c2e95a41d6
+Create Date: 2026-10-18 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c3f9a1d4e7b2"
+down_revision = "b7c2e95a41d6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row: hash of the last seed file applied, so an unchanged seed is a no-op.
+    op.create_table(
+        "catalog_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("seed_hash", sa.String(length=64), nullable=False),
+        sa.Column("applied_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("catalog_state")
@@ -0,0 +1,59 @@
+"""user portfolio summary
+
+Revision ID: d5e2b8c4a7f1
+Revises: c3f9a1d4e7b2
+Create Date: 2026-10-18 15:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d5e2b8c4a7f1"
+down_revision = "c3f9a1d4e7b2"
+branch_labels = None
+depends_on = None
+
+
+def _grouped(dimension, bucket):
+    group_by = "us.user_id" if bucket is None else f"us.user_id, {bucket}"
+    return f"""
+        SELECT us.user_id, '{dimension}', {bucket or "''"}, COUNT(*), SUM(us.quantity),
+               COALESCE(SUM(us.quantity * us.buy_price_eur), 0)
+        FROM user_skins us JOIN skins_catalog sc ON sc.id = us.catalog_skin_id
+        GROUP BY {group_by}"""
+
+
+def upgrade():
+    # Running totals per user and (dimension, bucket), kept in step by the
+    # inventory write paths; see app._portfolio_apply.
+    op.create_table(
+        "user_portfolio_summary",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("dimension", sa.String(length=16), nullable=False),
+        sa.Column("bucket", sa.String(length=128), nullable=False),
+        sa.Column("item_count", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("spend_eur", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "dimension", "bucket"),
+    )
+
+    # Backfill existing inventories.
+    op.execute(
+        "INSERT INTO user_portfolio_summary (user_id, dimension, bucket, item_count, quantity, spend_eur)"
+        + " UNION ALL ".join(
+            [
+                _grouped("total", None),
+                _grouped("weapon", "sc.weapon"),
+                _grouped("rarity", "sc.rarity"),
+                _grouped("wear", "COALESCE(us.wear, '')"),
+                _grouped("stattrak", "CASE WHEN us.stattrak THEN 'true' ELSE 'false' END"),
+            ]
+        )
+    )
+
+
+def downgrade():
+    op.drop_table("user_portfolio_summary")
@@ -0,0 +1,28 @@
+"""catalog version
+
+Revision ID: e8a4c6f2b9d3
+Revises: d5e2b8c4a7f1
+Create Date: 2026-10-18 16:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e8a4c6f2b9d3"
+down_revision = "d5e2b8c4a7f1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bumped by scripts/seed_catalog.py whenever catalog rows change; workers
+    # poll it to reload their search index and key catalog ETags/caches on it.
+    with op.batch_alter_table("catalog_state") as batch_op:
+        batch_op.add_column(sa.Column("catalog_version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table("catalog_state") as batch_op:
+        batch_op.drop_column("catalog_version")
@@ -0,0 +1,66 @@
+"""Password hashing on a bounded worker pool.
+
+scrypt is deliberately CPU- and memory-heavy. Running it inline lets a login
+burst occupy every request thread of a worker, so hashes are computed on a
+small dedicated pool instead. hashlib releases the GIL while hashing, so a
+thread pool runs them in parallel. Work beyond the pool size plus
+`queue_limit` is rejected immediately with `HashingOverloaded`, so callers
+can answer 503 instead of piling up. Keep that sum below the server's request
+threads, or the threads fill up before the pool ever rejects anything.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HashingOverloaded(Exception):
+    """The hashing pool is saturated or did not answer in time."""
+
+
+class PasswordHasher:
+    def __init__(self, method: str = "scrypt", workers: int = 2, queue_limit: int = 1, timeout: float = 10.0):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._executor = None
+        self._prefix = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Created on first use so a pre-forking server never inherits its threads.
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwhash")
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingOverloaded("password hashing queue is full")
+        try:
+            future = self._pool().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError as exc:
+            raise HashingOverloaded("password hashing timed out") from exc
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """True when `pwhash` was made with parameters other than the configured ones."""
+        if self._prefix is None:
+            # Expand shorthands like "scrypt" into the full "scrypt:n:r:p" form.
+            # Only hashing reveals it, and that hash belongs on the pool too.
+            self._prefix = self._run(generate_password_hash, "", self.method).split("$", 1)[0]
+        return pwhash.split("$", 1)[0] != self._prefix
@@ -0,0 +1,113 @@
+"""Background readiness probing.
+
+`/ready` must reflect dependency health without turning every orchestrator
+probe into database load, so each worker runs its checks on a daemon thread
+at a fixed interval and `/ready` only reads the last result.
+"""
+import ast
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from worker_thread import WorkerThread
+
+
+class ReadinessProber:
+    def __init__(self, app, checks: dict, interval: float = 5.0, required: tuple = (), first_probe_timeout: float = 1.0):
+        """`checks` maps a name to a callable returning a dict with an "ok" key.
+
+        Only checks listed in `required` decide readiness; the rest are reported.
+        `status` waits up to `first_probe_timeout` for a new worker's first probe.
+        """
+        self.app = app
+        self.checks = checks
+        self.interval = interval
+        self.required = required
+        self.first_probe_timeout = first_probe_timeout
+        self._report = None
+        self._probed_at = 0.0
+        self._probed = threading.Event()
+        self._thread = WorkerThread(self._loop, "readiness-prober", reset=self._forget_report)
+
+    def ensure_started(self) -> None:
+        self._thread.ensure_started()
+
+    def _forget_report(self) -> None:
+        self._report = None
+        self._probed = threading.Event()
+
+    def _loop(self) -> None:
+        while True:
+            self.probe()
+            time.sleep(self.interval)
+
+    def probe(self) -> None:
+        report = {}
+        with self.app.app_context():
+            for name, check in self.checks.items():
+                start = time.perf_counter()
+                try:
+                    result = check()
+                except Exception as exc:
+                    result = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+                result["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+                report[name] = result
+        self._report = report
+        self._probed_at = time.time()
+        self._probed.set()
+
+    def status(self) -> tuple:
+        """(ready, body) from the most recent probe."""
+        report = self._report
+        if report is None:
+            self.ensure_started()
+            self._probed.wait(self.first_probe_timeout)
+            report = self._report
+            if report is None:
+                return False, {"status": "starting"}
+
+        # A prober that stopped reporting must not keep the worker "ready".
+        stale = time.time() - self._probed_at > 3 * self.interval
+        ready = not stale and all(report[name]["ok"] for name in self.required)
+        return ready, {
+            "status": "ready" if ready else "not_ready",
+            "stale": stale,
+            "checked_at": datetime.fromtimestamp(self._probed_at, timezone.utc).isoformat(),
+            "checks": report,
+        }
+
+
+def _revision_ids(path: str) -> tuple:
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    values = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            if node.targets[0].id in ("revision", "down_revision"):
+                values[node.targets[0].id] = ast.literal_eval(node.value)
+    down = values.get("down_revision")
+    if down is None:
+        down = ()
+    elif isinstance(down, str):
+        down = (down,)
+    return values.get("revision"), tuple(down)
+
+
+def migration_heads(migrations_dir: str) -> set:
+    """Head revisions of migrations/versions, read without importing alembic.
+
+    Loading alembic's script directory costs a worker several hundred
+    milliseconds and memory it never needs again; the probe only needs the
+    revision graph, which is plain literals in each file.
+    """
+    versions_dir = os.path.join(migrations_dir, "versions")
+    revisions, parents = set(), set()
+    for name in os.listdir(versions_dir):
+        if not name.endswith(".py"):
+            continue
+        revision, down = _revision_ids(os.path.join(versions_dir, name))
+        if revision:
+            revisions.add(revision)
+            parents.update(down)
+    return revisions - parents
@@ -0,0 +1,52 @@
+"""Build resized WebP/JPEG variants of the images under data/.
+
+Writes `build/assets/<stem>-<width>w.{webp,jpg}` for every configured width
+narrower than the source image, plus a full-width WebP. The app fingerprints
+and serves whatever it finds there; without this step it just serves the
+originals. Needs Pillow, which is only installed in the image build stage.
+
+Usage:
+    python scripts/build_assets.py [--widths 360,640,1280,1920]
+"""
+import argparse
+from pathlib import Path
+
+from PIL import Image
+
+# Same locations as assets.SOURCE_DIR / assets.VARIANTS_DIR; not imported so the
+# image build stage does not need Flask.
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE_DIR = ROOT / "data"
+VARIANTS_DIR = ROOT / "build" / "assets"
+RASTER_SUFFIXES = {".jpg", ".jpeg", ".png"}
+DEFAULT_WIDTHS = "360,640,1280,1920"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build resized image variants")
+    parser.add_argument("--widths", default=DEFAULT_WIDTHS)
+    args = parser.parse_args()
+    widths = sorted({int(w) for w in args.widths.split(",") if w.strip()})
+
+    VARIANTS_DIR.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for source in sorted(SOURCE_DIR.iterdir()):
+        if source.suffix.lower() not in RASTER_SUFFIXES:
+            continue
+        with Image.open(source) as image:
+            image = image.convert("RGB")
+            targets = [w for w in widths if w < image.width] + [image.width]
+            for width in targets:
+                height = round(image.height * width / image.width)
+                resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                resized.save(VARIANTS_DIR / f"{source.stem}-{width}w.webp", "WEBP", quality=80, method=6)
+                written += 1
+                if width != image.width:
+                    resized.save(VARIANTS_DIR / f"{source.stem}-{width}w.jpg", "JPEG", quality=80, optimize=True, progressive=True)
+                    written += 1
+
+    print(f"Asset build complete: files={written}, output={VARIANTS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,78 +1,247 @@
+"""Sync skins_catalog with data/cs2_skins_seed.json.
+
+The SHA-256 of the seed file is stored in catalog_state after each run, so a
+deploy with an unchanged seed stops after hashing the file and one SELECT on
+a bare engine, before the Flask app is imported or built.
+
+Otherwise the seed is streamed into a temporary staging table in batched
+INSERTs. Only rows that are new or whose rarity changed go through
+`INSERT ... SELECT ... ON CONFLICT DO UPDATE`, and stale rows are removed with
+one set-based DELETE. Columns the seed does not carry (collection, image_url)
+are left alone.
+
+Usage:
+    python scripts/seed_catalog.py [seed.json] [--force]
+"""
+import hashlib
 import json
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterator
 
 ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from app import SkinCatalog, db, app
+from sqlalchemy import Column, MetaData, String, Table, and_, create_engine, exists, func, select, text, true
+from sqlalchemy.exc import DBAPIError
+
+from db_pool import database_url, sqlite_database_url
 
 
 DEFAULT_PATH = Path(__file__).resolve().parent.parent / "data" / "cs2_skins_seed.json"
+KEY_COLUMNS = ("game", "weapon", "skin_name")
+ALLOWED_RARITIES = {"Covert", "Extraordinary"}
+# Bump when the normalization below changes so the same file is applied again.
+SEED_FORMAT = b"cs2-covert-extraordinary-v1"
+# Rows per executemany into the staging table; the driver packs each batch into
+# multi-row INSERTs (sqlite3 executemany, SQLAlchemy insertmanyvalues on psycopg2).
+STAGING_BATCH_SIZE = 5000
+READ_CHUNK_SIZE = 1 << 16
+_NUMBER_CHARS = "0123456789+-.eE"
+
+
+def seed_hash(path: Path) -> str:
+    digest = hashlib.sha256(SEED_FORMAT)
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_json_array(f) -> Iterator:
+    """Yield the elements of a top-level JSON array without loading it whole.
+
+    Accepts what `json.load` accepts for an array: separators are checked
+    and only whitespace may follow the closing bracket.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def read_more() -> None:
+        nonlocal buffer, pos, eof
+        chunk = f.read(READ_CHUNK_SIZE)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def peek() -> str:
+        """Next non-whitespace character, or "" at the end of the file."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if eof:
+                return ""
+            read_more()
+
+    def value():
+        nonlocal pos
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A number running into the end of the buffer ("-1." of
+                # "-1.5e3") may continue in the next chunk.
+                if eof or buffer[end:].strip(_NUMBER_CHARS):
+                    pos = end
+                    return item
+            read_more()
+
+    if peek() != "[":
+        raise ValueError("seed file must contain a JSON array")
+    pos += 1
+    if peek() == "]":
+        pos += 1
+    else:
+        while True:
+            if peek() in ("", ",", "]"):
+                raise ValueError("expected an array element after '[' or ','")
+            yield value()
+            separator = peek()
+            pos += 1
+            if separator == "]":
+                break
+            if separator != ",":
+                raise ValueError(
+                    "seed file ended before the closing ]" if not separator else f"expected ',' or ']', found {separator!r}"
+                )
+    if peek():
+        raise ValueError("unexpected data after the closing ]")
 
 
-def main() -> None:
-    seed_file = DEFAULT_PATH
-    with seed_file.open("r", encoding="utf-8") as f:
-        items = json.load(f)
-
-    allowed_rarities = {"Covert", "Extraordinary"}
-    normalized = []
-    for item in items:
-        rarity = (item.get("rarity") or "").strip()
-        if rarity not in allowed_rarities:
-            continue
-        normalized.append(
-            {
+def iter_seed_rows(path: Path) -> Iterator[dict]:
+    with path.open("r", encoding="utf-8") as f:
+        for item in iter_json_array(f):
+            rarity = (item.get("rarity") or "").strip()
+            if rarity not in ALLOWED_RARITIES:
+                continue
+            yield {
                 "game": "cs2",
                 "weapon": item["weapon"].strip(),
                 "skin_name": item["skin_name"].strip(),
                 "rarity": rarity,
             }
-        )
 
-    inserted = 0
-    updated = 0
-    deleted = 0
 
-    desired_keys = {(i["game"], i["weapon"], i["skin_name"]) for i in normalized}
+def _upsert(dialect):
+    if dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert
+
+
+def _stage(conn, staging: Table, rows: Iterator[dict]) -> int:
+    # Deduplicated per batch for the staging primary key; a duplicate key in a
+    # later batch replaces the staged row, so the last occurrence wins.
+    stmt = _upsert(conn.dialect)(staging)
+    stmt = stmt.on_conflict_do_update(index_elements=list(KEY_COLUMNS), set_={"rarity": stmt.excluded.rarity})
+    batch = {}
+    for row in rows:
+        batch[(row["game"], row["weapon"], row["skin_name"])] = row
+        if len(batch) >= STAGING_BATCH_SIZE:
+            conn.execute(stmt, list(batch.values()))
+            batch = {}
+    if batch:
+        conn.execute(stmt, list(batch.values()))
+    return conn.scalar(select(func.count()).select_from(staging))
+
+
+def applied_seed():
+    """(seed_hash, applied_at) from catalog_state, or None before the first seed."""
+    engine = create_engine(sqlite_database_url(database_url()))
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT seed_hash, applied_at FROM catalog_state WHERE id = 1")).first()
+    except DBAPIError:
+        # No catalog_state table yet; the full sync below reports real errors.
+        return None
+    finally:
+        engine.dispose()
 
-    with app.app_context():
-        existing_rows = SkinCatalog.query.all()
-        for row in existing_rows:
-            key = (row.game, row.weapon, row.skin_name)
-            if key not in desired_keys:
-                db.session.delete(row)
-                deleted += 1
-
-        for item in normalized:
-            existing = SkinCatalog.query.filter_by(
-                game=item["game"], weapon=item["weapon"], skin_name=item["skin_name"]
-            ).first()
-            if existing:
-                existing.rarity = item["rarity"]
-                existing.collection = None
-                existing.image_url = None
-                updated += 1
-                continue
 
-            db.session.add(
-                SkinCatalog(
-                    game=item["game"],
-                    weapon=item["weapon"],
-                    skin_name=item["skin_name"],
-                    rarity=item["rarity"],
-                    collection=None,
-                    image_url=None,
+def main() -> None:
+    args = [a for a in sys.argv[1:] if a != "--force"]
+    force = "--force" in sys.argv[1:]
+    seed_file = Path(args[0]) if args else DEFAULT_PATH
+    file_hash = seed_hash(seed_file)
+
+    applied = None if force else applied_seed()
+    if applied is not None and applied.seed_hash == file_hash:
+        print(f"Seed unchanged: sha256={file_hash[:12]}, applied_at={applied.applied_at}")
+        return
+
+    # Imported only now: loading and building the app is most of a no-op run.
+    from app import CatalogState, SkinCatalog, create_app, db
+
+    app = create_app()
+    with app.app_context():
+        state = db.session.get(CatalogState, 1)
+
+        conn = db.session.connection()
+        catalog = SkinCatalog.__table__
+        staging = Table(
+            "catalog_seed_staging",
+            MetaData(),
+            Column("game", String(32), primary_key=True),
+            Column("weapon", String(64), primary_key=True),
+            Column("skin_name", String(128), primary_key=True),
+            Column("rarity", String(32), nullable=False),
+            prefixes=["TEMPORARY"],
+        )
+        staging.drop(conn, checkfirst=True)
+        staging.create(conn)
+        total_input = _stage(conn, staging, iter_seed_rows(seed_file))
+
+        same_key = and_(*(catalog.c[name] == staging.c[name] for name in KEY_COLUMNS))
+        unchanged_row = exists().where(same_key, catalog.c.rarity == staging.c.rarity)
+        existing = conn.scalar(select(func.count()).select_from(staging).where(exists().where(same_key)))
+        unchanged = conn.scalar(select(func.count()).select_from(staging).where(unchanged_row))
+        inserted = total_input - existing
+        updated = existing - unchanged
+        stale = ~exists().where(same_key)
+        deleted = conn.scalar(select(func.count()).select_from(catalog).where(stale))
+
+        if deleted:
+            conn.execute(catalog.delete().where(stale))
+        if inserted or updated:
+            # The WHERE also keeps SQLite from parsing ON CONFLICT as part of the SELECT.
+            upsert = _upsert(conn.dialect)(catalog).from_select(
+                [*KEY_COLUMNS, "rarity"],
+                select(staging.c.game, staging.c.weapon, staging.c.skin_name, staging.c.rarity).where(
+                    true(), ~unchanged_row
+                ),
+            )
+            conn.execute(
+                upsert.on_conflict_do_update(
+                    index_elements=list(KEY_COLUMNS), set_={"rarity": upsert.excluded.rarity}
                 )
             )
-            inserted += 1
 
+        staging.drop(conn)
+        if state is None:
+            state = CatalogState(id=1, catalog_version=1)
+            db.session.add(state)
+        elif inserted or updated or deleted:
+            # Workers reload their search index and drop cached catalog
+            # responses when this moves.
+            state.catalog_version = CatalogState.catalog_version + 1
+        state.seed_hash = file_hash
+        state.applied_at = datetime.now(timezone.utc)
         db.session.commit()
 
     print(
-        f"Seed complete: inserted={inserted}, updated={updated}, deleted={deleted}, total_input={len(normalized)}"
+        f"Seed complete: inserted={inserted}, updated={updated}, deleted={deleted}, "
+        f"unchanged={unchanged}, total_input={total_input}"
     )
 
 
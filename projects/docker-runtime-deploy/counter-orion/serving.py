@@ -0,0 +1,79 @@
+"""Production serving through gunicorn.
+
+The app is created once in the master before workers fork, so read-only
+state (compiled pages, asset manifest, imported modules) is shared
+copy-on-write. Per-worker caches and pools start empty after the fork. SIGTERM
+lets in-flight requests finish within WEB_GRACEFUL_TIMEOUT, which is what a
+`docker compose up -d` rollout sends to the old container.
+"""
+import os
+import shutil
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def gunicorn_options() -> dict:
+    threads = _env_int("WEB_THREADS", 4)
+    return {
+        "bind": os.getenv("WEB_BIND", "0.0.0.0:8080"),
+        "workers": _env_int("WEB_CONCURRENCY", 2),
+        "threads": threads,
+        "worker_class": "gthread" if threads > 1 else "sync",
+        "keepalive": _env_int("WEB_KEEPALIVE", 5),
+        "timeout": _env_int("WEB_TIMEOUT", 30),
+        "graceful_timeout": _env_int("WEB_GRACEFUL_TIMEOUT", 30),
+        "max_requests": _env_int("WEB_MAX_REQUESTS", 5000),
+        "max_requests_jitter": _env_int("WEB_MAX_REQUESTS_JITTER", 500),
+        "preload_app": True,
+        "accesslog": "-",
+        "errorlog": "-",
+    }
+
+
+def serve(app) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    from app import db
+
+    metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        # Samples from a previous run of this container would be summed in.
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+
+    def post_fork(server, worker):
+        # Never share pooled DB connections opened by the master with a worker.
+        with app.app_context():
+            db.engine.dispose(close=False)
+        # Build the catalog search index and probe readiness before the first
+        # request needs either.
+        app.extensions["catalog_search"].ensure_started()
+        app.extensions["readiness"].ensure_started()
+
+    def child_exit(server, worker):
+        if metrics_dir:
+            from prometheus_client import multiprocess
+
+            multiprocess.mark_process_dead(worker.pid)
+
+    class CounterOrionApplication(BaseApplication):
+        def load_config(self):
+            hooks = {"post_fork": post_fork, "child_exit": child_exit}
+            for key, value in {**gunicorn_options(), **hooks}.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    CounterOrionApplication().run()
+
+
+if __name__ == "__main__":
+    # The container entrypoint. `flask --app manage.py serve` works too, but
+    # the flask CLI imports every installed command plugin (flask-migrate,
+    # and with it alembic) before the app is even created.
+    from app import create_app
+
+    serve(create_app())
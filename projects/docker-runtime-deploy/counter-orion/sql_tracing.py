@@ -0,0 +1,121 @@
+"""Per-request SQL accounting and a structured slow-query log.
+
+Engine-level cursor hooks count statements and time spent in them for the
+current request. In debug mode (or with SQL_SERVER_TIMING=1) the totals are
+sent back as a `Server-Timing` header, so an N+1 pattern shows up as a
+growing `db-count` in the browser's network panel.
+
+Two JSON log lines go to the `counter_orion.sql` logger:
+- `slow_query` for any statement slower than SLOW_QUERY_MS, with the
+  normalized SQL (literals and IN/VALUES lists folded) and the endpoint;
+- `statement_budget` when one request issues more than SQL_STATEMENT_BUDGET
+  statements, with the most repeated statement, which is what a lazy load in
+  a loop looks like.
+"""
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SQL_STATEMENT_BUDGET = int(os.getenv("SQL_STATEMENT_BUDGET", "25"))
+
+logger = logging.getLogger("counter_orion.sql")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_PARAM_LIST = re.compile(rf"\(\s*{_PARAM}(?:\s*,\s*{_PARAM})*\s*\)")
+_ROW_LIST = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Fold literals and parameter lists so equivalent statements compare equal."""
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _PARAM_LIST.sub("(...)", statement)
+    statement = _ROW_LIST.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _log(event_name: str, **fields) -> None:
+    logger.warning(json.dumps({"event": event_name, **fields}, default=str))
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    endpoint = None
+    if has_request_context():
+        endpoint = request.endpoint
+        g.sql_count = g.get("sql_count", 0) + 1
+        g.sql_time = g.get("sql_time", 0.0) + elapsed
+        g.setdefault("sql_statements", Counter())[statement] += 1
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        _log(
+            "slow_query",
+            duration_ms=round(elapsed * 1000, 2),
+            endpoint=endpoint,
+            executemany=executemany,
+            sql=normalize_sql(statement),
+        )
+
+
+def request_db_time() -> float:
+    return g.get("sql_time", 0.0)
+
+
+def _after_request(response):
+    if g.get("sql_server_timing"):
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={g.get("sql_time", 0.0) * 1000:.2f}, db-count;desc="{g.get("sql_count", 0)}"',
+        )
+    return response
+
+
+def _teardown_request(exc):
+    # Runs after a streamed body is exhausted, so the count covers all of it.
+    count = g.get("sql_count", 0)
+    if count <= SQL_STATEMENT_BUDGET:
+        return
+    statement, repeats = g.sql_statements.most_common(1)[0]
+    _log(
+        "statement_budget",
+        endpoint=request.endpoint,
+        method=request.method,
+        statements=count,
+        db_ms=round(g.get("sql_time", 0.0) * 1000, 2),
+        most_repeated=normalize_sql(statement),
+        repeats=repeats,
+    )
+
+
+def init_app(app) -> None:
+    server_timing = os.getenv("SQL_SERVER_TIMING", "0").lower() in ("1", "true", "yes", "on")
+
+    def _before_request():
+        g.sql_server_timing = server_timing or app.debug
+
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
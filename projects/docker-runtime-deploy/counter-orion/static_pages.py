@@ -0,0 +1,64 @@
+"""Pre-rendered HTML pages served from memory.
+
+Pages are rendered and compressed once at startup. Requests then only pick an
+encoding and compare ETags, so a page view costs almost no CPU, and a
+revalidation costs a 304 with no body.
+"""
+import gzip
+import hashlib
+from pathlib import Path
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+PAGES_DIR = Path(__file__).resolve().parent / "pages"
+
+
+class StaticPage:
+    def __init__(self, body: bytes, mimetype: str = "text/html", cache_control: str = "no-cache"):
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        digest = hashlib.sha256(body).hexdigest()[:32]
+
+        # encoding -> (body, etag); each representation gets its own strong ETag.
+        self.variants = {"identity": (body, digest)}
+        gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(gzipped) < len(body):
+            self.variants["gzip"] = (gzipped, f"{digest}-gzip")
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            if len(compressed) < len(body):
+                self.variants["br"] = (compressed, f"{digest}-br")
+
+    def _negotiate(self) -> str:
+        accepted = request.accept_encodings
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accepted[encoding]:
+                return encoding
+        return "identity"
+
+    def response(self) -> Response:
+        encoding = self._negotiate()
+        body, etag = self.variants[encoding]
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype=self.mimetype)
+            if encoding != "identity":
+                response.headers["Content-Encoding"] = encoding
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = self.cache_control
+        response.vary.add("Accept-Encoding")
+        return response
+
+
+def render_page(filename: str, replacements: dict) -> StaticPage:
+    html = (PAGES_DIR / filename).read_text(encoding="utf-8")
+    for placeholder, value in replacements.items():
+        html = html.replace(placeholder, value)
+    return StaticPage(html.encode("utf-8"))
@@ -0,0 +1,40 @@
+"""Autocomplete ranking, typo tolerance included."""
+import json
+
+import pytest
+
+from catalog_search import CatalogEntry, CatalogIndex
+from conftest import ROOT
+
+
+@pytest.fixture(scope="module")
+def index():
+    rows = json.loads((ROOT / "data" / "cs2_skins_seed.json").read_text())
+    return CatalogIndex(CatalogEntry(i, row["weapon"], row["skin_name"], row["rarity"]) for i, row in enumerate(rows))
+
+
+def _names(index, query: str, limit: int = 3) -> list:
+    return [f"{entry.weapon} | {entry.skin_name}" for entry in index.search(query, limit)]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("dargon lore", "AWP | Dragon Lore"),  # transposition
+        ("asimov", "AK-47 | Asiimov"),  # missing letter
+        ("printstram", "AWP | Printstream"),  # missing letter, two typos allowed
+        ("hyper beest", "AWP | Hyper Beast"),  # typo in the second word
+        ("dragn lo", "AWP | Dragon Lore"),  # last word still being typed
+    ],
+)
+def test_typos_find_the_intended_skin(index, query, expected):
+    assert _names(index, query)[0] == expected
+
+
+def test_exact_matches_suppress_fuzzy_ones(index):
+    # Entries one typo from "bad" (Fade, Gamma Doppler, ...) must not pad the list.
+    assert _names(index, "bad", limit=10) == ["FAMAS | Bad Trip"]
+
+
+def test_short_words_are_not_fuzzy(index):
+    assert _names(index, "zq") == []
@@ -0,0 +1,85 @@
+"""Summary rows maintained per write must match a full rebuild from the inventory."""
+import json
+
+from sqlalchemy import select
+
+from app import SkinCatalog, User, UserPortfolioSummary, _create_token, db, rebuild_portfolio_summaries
+
+
+def _summary(user_id: int) -> list:
+    table = UserPortfolioSummary.__table__
+    rows = db.session.execute(select(table).where(table.c.user_id == user_id))
+    return sorted(tuple(row) for row in rows)
+
+
+def _assert_matches_rebuild(app, user_id: int) -> None:
+    with app.app_context():
+        incremental = _summary(user_id)
+        rebuild_portfolio_summaries()
+        assert incremental == _summary(user_id)
+        assert incremental
+
+
+def test_incremental_summary_matches_rebuild(app, client):
+    with app.app_context():
+        user = User(email="summary@orion.local", username="summary", password_hash="x")
+        db.session.add(user)
+        db.session.flush()
+        catalog = [
+            SkinCatalog(weapon="Summary Rifle", skin_name="Ember", rarity="Covert"),
+            SkinCatalog(weapon="Summary Rifle", skin_name="Frost", rarity="Classified"),
+            SkinCatalog(weapon="Summary Pistol", skin_name="Moss", rarity="Mil-Spec"),
+        ]
+        db.session.add_all(catalog)
+        db.session.flush()
+        user_id = user.id
+        ember, frost, moss = (item.id for item in catalog)
+        headers = {"Authorization": f"Bearer {_create_token(user, 'access')}"}
+        db.session.commit()
+
+    added = []
+    for payload in (
+        {"catalog_skin_id": ember, "wear": "Factory New", "quantity": 2, "buy_price_eur": 10.005},
+        {"catalog_skin_id": frost, "wear": "Field-Tested", "stattrak": True, "buy_price_eur": 3.5},
+        {"catalog_skin_id": moss},
+    ):
+        resp = client.post("/skins", json=payload, headers=headers)
+        assert resp.status_code == 201
+        added.append(resp.get_json()["id"])
+    _assert_matches_rebuild(app, user_id)
+
+    assert client.put(f"/skins/{added[0]}", json={"wear": "Minimal Wear", "quantity": 3}, headers=headers).status_code == 200
+    assert client.put(f"/skins/{added[1]}", json={"buy_price_eur": None, "stattrak": False}, headers=headers).status_code == 200
+    _assert_matches_rebuild(app, user_id)
+
+    assert client.delete(f"/skins/{added[2]}", headers=headers).status_code == 200
+    _assert_matches_rebuild(app, user_id)
+
+    lines = [
+        {"catalog_skin_id": moss, "wear": "Battle-Scarred", "buy_price_eur": 0.12},
+        {"skin": "Summary Rifle | Ember", "stattrak": True, "quantity": 4, "buy_price_eur": 7},
+        {"weapon": "Summary Rifle", "skin_name": "Frost"},
+    ]
+    resp = client.post(
+        "/skins/import",
+        data="\n".join(json.dumps(line) for line in lines),
+        content_type="application/x-ndjson",
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    assert resp.get_json()["imported"] == 3
+    _assert_matches_rebuild(app, user_id)
+
+    resp = client.post(
+        "/skins/batch",
+        json={
+            "operations": [
+                {"op": "create", "catalog_skin_id": frost, "wear": "Well-Worn", "buy_price_eur": 1.25},
+                {"op": "update", "id": added[0], "stattrak": True, "buy_price_eur": 12},
+                {"op": "delete", "id": added[1]},
+            ]
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    _assert_matches_rebuild(app, user_id)
@@ -0,0 +1,102 @@
+"""POST /skins/batch validates every operation before writing any of them."""
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app import SkinCatalog, User, UserSkin, _create_token, db
+
+
+def _user_with_entries(app, username: str) -> tuple:
+    """Create a user owning two entries; return (user id, auth headers, catalog id, entry ids)."""
+    with app.app_context():
+        user = User(email=f"{username}@orion.local", username=username, password_hash="x")
+        catalog = SkinCatalog(weapon=f"Weapon {username}", skin_name="Batch", rarity="Covert")
+        db.session.add_all([user, catalog])
+        db.session.flush()
+        entries = [
+            UserSkin(user_id=user.id, catalog_skin_id=catalog.id, wear="Factory New", buy_price_eur=Decimal("5.00")),
+            UserSkin(user_id=user.id, catalog_skin_id=catalog.id, wear="Field-Tested", quantity=2, note="keep"),
+        ]
+        db.session.add_all(entries)
+        db.session.flush()
+        result = (
+            user.id,
+            {"Authorization": f"Bearer {_create_token(user, 'access')}"},
+            catalog.id,
+            [entry.id for entry in entries],
+        )
+        db.session.commit()
+    return result
+
+
+def _entries(app, user_id: int) -> dict:
+    """Entry id -> (wear, stattrak, quantity, note, buy_price_eur) for the user."""
+    with app.app_context():
+        rows = db.session.execute(
+            select(UserSkin.id, UserSkin.wear, UserSkin.stattrak, UserSkin.quantity, UserSkin.note, UserSkin.buy_price_eur)
+            .where(UserSkin.user_id == user_id)
+        )
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def test_one_invalid_operation_rejects_the_whole_batch(app, client):
+    user_id, headers, catalog_id, (first, second) = _user_with_entries(app, "batch_atomic")
+    before = _entries(app, user_id)
+
+    resp = client.post(
+        "/skins/batch",
+        json={
+            "operations": [
+                {"op": "create", "catalog_skin_id": catalog_id},
+                {"op": "update", "id": first, "quantity": 5},
+                {"op": "delete", "id": second},
+                {"op": "update", "id": 10**9, "quantity": 1},
+                {"op": "create", "catalog_skin_id": catalog_id, "quantity": 0},
+            ]
+        },
+        headers=headers,
+    )
+
+    assert resp.status_code == 422
+    assert resp.get_json()["errors"] == [
+        {"index": 3, "error": "skin entry not found"},
+        {"index": 4, "error": "quantity must be >= 1"},
+    ]
+    assert _entries(app, user_id) == before
+
+
+def test_an_entry_may_appear_in_only_one_operation(app, client):
+    user_id, headers, _, (first, _) = _user_with_entries(app, "batch_duplicate")
+    before = _entries(app, user_id)
+
+    resp = client.post(
+        "/skins/batch",
+        json={"operations": [{"op": "update", "id": first, "quantity": 3}, {"op": "delete", "id": first}]},
+        headers=headers,
+    )
+
+    assert resp.status_code == 422
+    assert resp.get_json()["errors"] == [{"index": 1, "error": "id appears in more than one operation"}]
+    assert _entries(app, user_id) == before
+
+
+def test_updates_touching_different_fields_leave_the_others_alone(app, client):
+    user_id, headers, _, (first, second) = _user_with_entries(app, "batch_updates")
+
+    resp = client.post(
+        "/skins/batch",
+        json={
+            "operations": [
+                {"op": "update", "id": first, "quantity": 4},
+                {"op": "update", "id": second, "wear": "Minimal Wear", "buy_price_eur": 1.005},
+            ]
+        },
+        headers=headers,
+    )
+
+    assert resp.status_code == 200
+    assert [item["id"] for item in resp.get_json()["updated"]] == [first, second]
+    assert _entries(app, user_id) == {
+        first: ("Factory New", False, 4, None, Decimal("5.00")),
+        second: ("Minimal Wear", False, 2, "keep", Decimal("1.01")),
+    }
@@ -0,0 +1,58 @@
+"""GET /skins must issue a constant number of statements, however large the inventory."""
+from flask import has_request_context
+from sqlalchemy import event, insert
+
+from app import SkinCatalog, User, UserSkin, _create_token, db, user_cache
+
+
+def _user_with_skins(app, username: str, count: int) -> str:
+    """Create a user owning `count` entries and return an access token for them."""
+    with app.app_context():
+        user = User(email=f"{username}@orion.local", username=username, password_hash="x")
+        db.session.add(user)
+        db.session.flush()
+        catalog = [
+            SkinCatalog(weapon=f"Weapon {username}", skin_name=f"Skin {i:03d}", rarity="Covert")
+            for i in range(count)
+        ]
+        db.session.add_all(catalog)
+        db.session.flush()
+        db.session.execute(
+            insert(UserSkin),
+            [{"user_id": user.id, "catalog_skin_id": item.id, "quantity": 1, "buy_price_eur": 10} for item in catalog],
+        )
+        token = _create_token(user, "access")
+        db.session.commit()
+    return token
+
+
+def _statements_for(app, client, token: str) -> tuple:
+    statements = []
+
+    # Background threads (readiness, catalog index) run without a request context.
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        user_cache.clear()
+        resp = client.get("/skins", headers={"Authorization": f"Bearer {token}"})
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert resp.status_code == 200
+    return len(statements), resp.get_json()["total"]
+
+
+def test_skins_list_statement_count_is_constant(app, client):
+    one = _user_with_skins(app, "one_skin", 1)
+    many = _user_with_skins(app, "many_skins", 40)
+
+    one_count, one_total = _statements_for(app, client, one)
+    many_count, many_total = _statements_for(app, client, many)
+
+    assert (one_total, many_total) == (1, 40)
+    # The user lookup and the joined inventory query.
+    assert one_count == many_count == 2
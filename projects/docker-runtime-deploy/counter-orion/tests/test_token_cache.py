@@ -0,0 +1,56 @@
+"""A cached token payload must never outlive the checks jwt.decode would apply."""
+import hashlib
+import time
+
+import jwt
+import pytest
+
+import app as app_module
+from app import JWT_SECRET, _decode_token, token_cache
+
+
+def _token(token_type: str = "access", ttl: float = 60, secret: str = JWT_SECRET) -> str:
+    now = int(time.time())
+    payload = {"sub": "1", "type": token_type, "iat": now, "exp": now + ttl}
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+def _cached(token: str) -> bool:
+    return token_cache.get(hashlib.sha256(token.encode("utf-8")).digest()) is not None
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+def test_cached_token_past_exp_is_rejected(monkeypatch):
+    token = _token(ttl=60)
+    _decode_token(token, "access")
+    assert _cached(token)
+
+    # The cache entry (monotonic clock) is still live; only the wall clock moved past exp.
+    now = time.time()
+    monkeypatch.setattr(app_module.time, "time", lambda: now + 120)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        _decode_token(token, "access")
+    assert not _cached(token)
+
+
+def test_wrong_type_is_rejected_on_a_cache_hit():
+    token = _token("access")
+    _decode_token(token, "access")
+    assert _cached(token)
+
+    with pytest.raises(jwt.InvalidTokenError, match="invalid token type"):
+        _decode_token(token, "refresh")
+
+
+def test_bad_signature_is_rejected_and_not_cached():
+    token = _token(secret=JWT_SECRET + "-forged")
+
+    with pytest.raises(jwt.InvalidSignatureError):
+        _decode_token(token, "access")
+    assert not _cached(token)
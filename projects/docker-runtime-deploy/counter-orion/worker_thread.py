@@ -0,0 +1,33 @@
+"""Daemon threads started once per worker process.
+
+Shared by the catalog search index and the readiness prober, which both keep
+their state fresh from a background loop.
+"""
+import os
+import threading
+
+
+class WorkerThread:
+    """Starts `target` on a daemon thread at most once per process.
+
+    `reset` runs first in each new process, under the lock, to drop state
+    inherited from the parent (e.g. results its thread produced).
+    """
+
+    def __init__(self, target, name: str, reset=None):
+        self.target = target
+        self.name = name
+        self.reset = reset
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self) -> None:
+        # Threads do not survive fork, so every worker starts its own.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                if self.reset is not None:
+                    self.reset()
+                threading.Thread(target=self.target, name=self.name, daemon=True).start()
@@ -13,6 +13,11 @@ VM2_HOST="${VM2_HOST:?VM2_HOST is required}"
 VM2_USER="${VM2_USER:?VM2_USER is required}"
 APP_NAME="${APP_NAME:-counter-orion}"
 APP_PORT="${APP_PORT:-8080}"
+WEB_CONCURRENCY="${WEB_CONCURRENCY:-2}"
+WEB_THREADS="${WEB_THREADS:-4}"
+WEB_KEEPALIVE="${WEB_KEEPALIVE:-5}"
+WEB_MAX_REQUESTS="${WEB_MAX_REQUESTS:-5000}"
+WEB_GRACEFUL_TIMEOUT="${WEB_GRACEFUL_TIMEOUT:-30}"
 POSTGRES_DB="${POSTGRES_DB:-orion}"
 POSTGRES_USER="${POSTGRES_USER:-orion}"
 POSTGRES_PASSWORD="${POSTGRES_PASSWORD:-change_me}"
@@ -33,6 +38,11 @@ set -euo pipefail
 cat > /home/${VM2_USER}/.env <<ENV
 APP_NAME=${APP_NAME}
 APP_PORT=${APP_PORT}
+WEB_CONCURRENCY=${WEB_CONCURRENCY}
+WEB_THREADS=${WEB_THREADS}
+WEB_KEEPALIVE=${WEB_KEEPALIVE}
+WEB_MAX_REQUESTS=${WEB_MAX_REQUESTS}
+WEB_GRACEFUL_TIMEOUT=${WEB_GRACEFUL_TIMEOUT}
 POSTGRES_DB=${POSTGRES_DB}
 POSTGRES_USER=${POSTGRES_USER}
 POSTGRES_PASSWORD=${POSTGRES_PASSWORD}
@@ -11,7 +11,7 @@ fi
 
 VM2_HOST="${VM2_HOST:?VM2_HOST is required}"
 APP_PORT="${1:-${APP_PORT:-8080}}"
-HEALTH_URL="http://${VM2_HOST}:${APP_PORT}/health"
+HEALTH_URL="http://${VM2_HOST}:${APP_PORT}/ready"
 MAX_ATTEMPTS=30
 SLEEP_SECONDS=2
 